@@ -13,7 +13,7 @@ from uuid import UUID
 
 from app.db.database import get_db
 from app.db.models import Alert, MonitoringSession
-from app.schemas.eeg import AlertData, AlertResponse, AlertUpdate, AlertList
+from app.schemas.eeg import AlertData, AlertResponse, AlertUpdate, AlertList, fast_from_orm
 
 router = APIRouter(prefix="/alerts", tags=["Alerts"])
 
@@ -70,11 +70,11 @@ async def list_alerts(
     # Apply pagination
     alerts = query.limit(limit).offset(offset).all()
     
-    return AlertList(
+    return AlertList.model_construct(
         total=total,
         limit=limit,
         offset=offset,
-        alerts=alerts
+        alerts=[fast_from_orm(AlertResponse, alert) for alert in alerts]
     )
 
 
@@ -9,7 +9,7 @@ from typing import Dict
 from uuid import UUID
 from datetime import datetime
 
-from app.schemas.eeg import EEGStreamData, EEGDataPoint
+from app.schemas.eeg import EEGStreamData, EEGStreamBatch, EEGDataPoint
 from app.api.websocket_manager import manager
 from app.core.eeg_relay import relay_eeg_to_clients, save_eeg_to_database
 
@@ -64,6 +64,39 @@ async def receive_eeg_stream(
     }
 
 
+@router.post("/stream/batch", status_code=status.HTTP_200_OK)
+async def receive_eeg_stream_batch(
+    batch: EEGStreamBatch,
+    background_tasks: BackgroundTasks
+):
+    """
+    Receive several /stream payloads in one request
+    
+    The Python LSL middleware merges payloads that queued up while the
+    backend was slow. Each sample is handled exactly like a POST to
+    /stream (activity tracking, WebSocket relay, optional DB save).
+    
+    **Request Body**:
+    - samples: Array of /stream payloads, oldest first
+    """
+    total_clients = 0
+    for data in batch.samples:
+        session_id_str = str(data.session_id)
+        active_eeg_sessions[session_id_str] = datetime.now()
+        
+        clients = await relay_eeg_to_clients(session_id_str, data.dict())
+        total_clients = max(total_clients, clients)
+        
+        if data.save_to_db:
+            background_tasks.add_task(save_eeg_to_database, data)
+    
+    return {
+        "status": "received",
+        "samples": len(batch.samples),
+        "clients_notified": total_clients
+    }
+
+
 @router.post("/batch", status_code=status.HTTP_200_OK)
 async def receive_eeg_batch(
     session_id: UUID,
@@ -4,24 +4,30 @@ Retrieve historical EEG data for session replay
 Generic EEG Monitoring Template
 """
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional
 from uuid import UUID
 from datetime import datetime
 
-from app.db.database import get_db
+from app.db.database import get_db, SessionLocal
 from app.db.models import (
     User, MonitoringSession, EEGData, Alert
 )
 from app.schemas.eeg import (
     EEGDataResponse, PaginatedEEGResponse,
-    TimelineEvent, TimelineResponse
+    TimelineEvent, TimelineResponse, fast_from_orm
 )
 from app.api.dependencies import get_current_user
 
 router = APIRouter(prefix="/sessions", tags=["Session Playback"])
 
+# Columns emitted per row by the NDJSON stream (same shape as EEGDataResponse)
+EEG_STREAM_COLUMNS = tuple(EEGDataResponse.model_fields)
+STREAM_BATCH_SIZE = 1024
+
 
 def _get_user_session(session_id: UUID, current_user: User, db: Session) -> MonitoringSession:
     """Helper: get session and verify ownership"""
@@ -65,15 +71,54 @@ async def get_session_eeg(
     offset = (page - 1) * page_size
     records = query.order_by(EEGData.timestamp.asc()).offset(offset).limit(page_size).all()
 
-    return PaginatedEEGResponse(
+    return PaginatedEEGResponse.model_construct(
         total=total,
         page=page,
         page_size=page_size,
         has_next=(offset + page_size) < total,
-        data=records,
+        data=[fast_from_orm(EEGDataResponse, record) for record in records],
     )
 
 
+@router.get("/{session_id}/eeg/stream")
+async def stream_session_eeg(
+    session_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    start_time: Optional[datetime] = Query(None, description="Filter from timestamp"),
+    end_time: Optional[datetime] = Query(None, description="Filter to timestamp"),
+):
+    """
+    Stream all EEG data for a session as NDJSON (one JSON object per line).
+
+    Intended for large playback windows: rows are read from a server-side
+    cursor and written out as they arrive, so memory use does not grow with
+    the number of samples. Use the paginated endpoint for small pages.
+    """
+    _get_user_session(session_id, current_user, db)
+
+    def _generate():
+        # The request-scoped session is closed before the body is streamed,
+        # so the generator owns its own session.
+        stream_db = SessionLocal()
+        try:
+            query = stream_db.query(EEGData).filter(EEGData.session_id == session_id)
+            if start_time:
+                query = query.filter(EEGData.timestamp >= start_time)
+            if end_time:
+                query = query.filter(EEGData.timestamp <= end_time)
+
+            rows = query.order_by(EEGData.timestamp.asc()).yield_per(STREAM_BATCH_SIZE)
+            for row in rows:
+                yield orjson.dumps(
+                    {col: getattr(row, col) for col in EEG_STREAM_COLUMNS}
+                ) + b"\n"
+        finally:
+            stream_db.close()
+
+    return StreamingResponse(_generate(), media_type="application/x-ndjson")
+
+
 @router.get("/{session_id}/timeline", response_model=TimelineResponse)
 async def get_session_timeline(
     session_id: UUID,
@@ -4,11 +4,24 @@ Pydantic models for EEG data and alerting
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Union, List, Any
+from typing import Optional, Dict, Union, List, Any, Literal, Type, TypeVar
 from datetime import datetime
 from uuid import UUID
 
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def fast_from_orm(cls: Type[ModelT], obj: Any) -> ModelT:
+    """
+    Build a response model from an ORM row without re-validating it.
+    
+    Only use for rows read from the database, whose column types already
+    match the schema. Inbound request payloads must keep full validation.
+    """
+    return cls.model_construct(**{name: getattr(obj, name) for name in cls.model_fields})
+
+
 class EEGDataPoint(BaseModel):
     """Schema for single EEG data point"""
     timestamp: datetime
@@ -21,7 +34,7 @@ class EEGDataPoint(BaseModel):
     theta_alpha_ratio: Optional[float] = Field(None, ge=0, description="Drowsiness indicator")
     beta_alpha_ratio: Optional[float] = Field(None, ge=0, description="Engagement index")
     signal_quality: Optional[float] = Field(None, ge=0, le=1, description="Signal quality (0-1)")
-    cognitive_state: Optional[str] = Field(None, pattern="^(alert|drowsy|fatigued)$")
+    cognitive_state: Optional[Literal["alert", "drowsy", "fatigued"]] = None
     eeg_fatigue_score: Optional[float] = Field(None, ge=0, le=100, description="EEG fatigue score (0-100)")
 
 
@@ -71,6 +84,14 @@ class EEGStreamData(BaseModel):
     }
 
 
+class EEGStreamBatch(BaseModel):
+    """
+    Several EEGStreamData payloads sent in one request by the Python LSL
+    middleware (when it falls behind), oldest first
+    """
+    samples: List[EEGStreamData] = Field(..., min_length=1)
+
+
 class EEGBatchData(BaseModel):
     """Schema for WebSocket streaming"""
     session_id: UUID
@@ -81,7 +102,7 @@ class AlertData(BaseModel):
     """Schema for fatigue alert"""
     session_id: UUID
     timestamp: datetime
-    alert_level: str = Field(..., pattern="^(warning|critical)$")
+    alert_level: Literal["warning", "critical"]
     fatigue_score: float = Field(..., ge=0, le=100)
     eeg_contribution: float = Field(default=1.0, ge=0, le=1)
     trigger_reason: str
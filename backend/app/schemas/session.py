@@ -4,7 +4,7 @@ Pydantic models for monitoring session data validation
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Literal
 from uuid import UUID
 from datetime import datetime
 
@@ -26,7 +26,7 @@ class SessionCreate(SessionBase):
 class SessionUpdate(BaseModel):
     """Schema for updating session"""
     session_name: Optional[str] = Field(None, min_length=1, max_length=255)
-    session_status: Optional[str] = Field(None, pattern="^(active|completed|failed)$")
+    session_status: Optional[Literal["active", "completed", "failed"]] = None
     calibration_data: Optional[Dict[str, Any]] = None
     settings: Optional[Dict[str, Any]] = None
     context_metadata: Optional[Dict[str, Any]] = None
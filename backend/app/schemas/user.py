@@ -5,7 +5,7 @@ Week 2, Tuesday - API Routes
 """
 
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import Optional, Literal
 from uuid import UUID
 from datetime import datetime
 
@@ -14,7 +14,7 @@ class UserBase(BaseModel):
     """Base user schema with common fields"""
     email: EmailStr
     full_name: str = Field(..., min_length=2, max_length=255)
-    role: str = Field(default="student", pattern="^(student|researcher|admin)$")
+    role: Literal["student", "researcher", "admin"] = "student"
 
 
 class UserCreate(UserBase):
@@ -26,7 +26,7 @@ class UserUpdate(BaseModel):
     """Schema for updating user information"""
     email: Optional[EmailStr] = None
     full_name: Optional[str] = Field(None, min_length=2, max_length=255)
-    role: Optional[str] = Field(None, pattern="^(student|researcher|admin)$")
+    role: Optional[Literal["student", "researcher", "admin"]] = None
     is_active: Optional[bool] = None
     profile_picture: Optional[str] = None
 
@@ -5,7 +5,10 @@ Main application entry point
 
 import time
 import uuid
+import queue
+import asyncio
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
@@ -24,10 +27,18 @@ from app.api.routes.playback import router as playback_router
 from app.api.routes.export import router as export_router
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Records are handed to a background thread through a queue, so request
+# logging never blocks the event loop on stdout writes
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 )
+_log_listener = QueueListener(_log_queue, _log_stream_handler)
+
+_root_logger = logging.getLogger()
+_root_logger.setLevel(logging.INFO)
+_root_logger.addHandler(QueueHandler(_log_queue))
 logger = logging.getLogger(__name__)
 
 # ============================================
@@ -216,23 +227,29 @@ async def api_info():
 @app.on_event("startup")
 async def startup_event():
     """Execute on application startup"""
+    _log_listener.start()
+    
     print("=" * 60)
     print("🧠 EEG Monitoring API Starting...")
     print(f"📝 Environment: {settings.ENVIRONMENT}")
     
-    print("\n🔧 Initializing Redis...")
-    init_redis()
+    # Redis and Firebase block on network handshakes, so run them in worker
+    # threads alongside the EEG buffer start-up instead of one after another
+    from app.core.eeg_relay import start_eeg_buffer
     
-    print("\n🔥 Initializing Firebase...")
-    init_firebase()
+    print("\n🔧 Initializing Redis, Firebase and EEG data buffer...")
+    startup_tasks = {
+        "Redis": asyncio.to_thread(init_redis),
+        "Firebase": asyncio.to_thread(init_firebase),
+        "EEG buffer": start_eeg_buffer(),
+    }
+    results = await asyncio.gather(*startup_tasks.values(), return_exceptions=True)
     
-    print("\n📊 Starting EEG data buffer...")
-    try:
-        from app.core.eeg_relay import start_eeg_buffer
-        await start_eeg_buffer()
-        print("✅ EEG buffer started successfully")
-    except Exception as e:
-        print(f"❌ Failed to start EEG buffer: {e}")
+    for name, result in zip(startup_tasks, results):
+        if isinstance(result, Exception):
+            logger.error(f"❌ Failed to start {name}: {result}", exc_info=result)
+        elif name == "EEG buffer":
+            print("✅ EEG buffer started successfully")
     
     print(f"\n📚 Documentation: /api/docs")
     print(f"🔌 WebSocket: /api/v1/ws/session/{{session_id}}")
@@ -257,6 +274,9 @@ async def shutdown_event():
     close_redis()
     
     print("=" * 60)
+    
+    # Drain any queued log records before exiting
+    _log_listener.stop()
 
 
 if __name__ == "__main__":
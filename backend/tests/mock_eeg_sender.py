@@ -6,10 +6,11 @@ This script is for testing the EEG data relay system without real hardware.
 Week 3, Monday - Testing Tool
 """
 
-import requests
+import asyncio
+import httpx
+import orjson
 import time
 import random
-from datetime import datetime
 from uuid import uuid4
 
 
@@ -20,6 +21,42 @@ SAMPLE_RATE = 256  # Hz (Muse 2 default)
 SEND_INTERVAL = 1.0 / SAMPLE_RATE  # Send every ~4ms for 256 Hz
 
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Payload skeleton built once; generate_mock_eeg_sample() only patches the
+# fields that change per sample. The dict is shared, so serialize it before
+# generating the next sample.
+_TEMPLATE = {
+    "session_id": SESSION_ID,
+    "timestamp": "",
+    "sample_rate": SAMPLE_RATE,
+    "channels": {"TP9": 0.0, "AF7": 0.0, "AF8": 0.0, "TP10": 0.0},
+    "processed": {
+        "theta_power": 0.0,
+        "alpha_power": 0.0,
+        "theta_alpha_ratio": 0.0,
+        "fatigue_score": 0.0
+    },
+    "save_to_db": False  # Set to True to save to database
+}
+_CHANNELS = _TEMPLATE["channels"]
+_PROCESSED = _TEMPLATE["processed"]
+
+# Second-resolution timestamp prefix, reformatted only when the second changes
+_ts_sec = -1
+_ts_prefix = ""
+
+
+def _timestamp() -> str:
+    """ISO-8601 local timestamp with microseconds and a trailing 'Z'"""
+    global _ts_sec, _ts_prefix
+    sec, ns = divmod(time.time_ns(), 1_000_000_000)
+    if sec != _ts_sec:
+        _ts_sec = sec
+        _ts_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(sec))
+    return f"{_ts_prefix}.{ns // 1000:06d}Z"
+
+
 def generate_mock_eeg_sample():
     """
     Generate realistic mock EEG data
@@ -29,52 +66,41 @@ def generate_mock_eeg_sample():
     state = random.choice(["alert", "alert", "drowsy", "fatigued"])
     
     # Base channel values (simulated microvolts)
-    base_tp9 = random.uniform(0.1, 0.5)
-    base_af7 = random.uniform(0.1, 0.5)
-    base_af8 = random.uniform(0.1, 0.5)
-    base_tp10 = random.uniform(0.1, 0.5)
+    _CHANNELS["TP9"] = random.uniform(0.1, 0.5)
+    _CHANNELS["AF7"] = random.uniform(0.1, 0.5)
+    _CHANNELS["AF8"] = random.uniform(0.1, 0.5)
+    _CHANNELS["TP10"] = random.uniform(0.1, 0.5)
     
     # Processed metrics based on state
     if state == "alert":
         theta_power = random.uniform(0.2, 0.4)
         alpha_power = random.uniform(0.5, 0.7)
-        theta_alpha_ratio = theta_power / alpha_power
         fatigue_score = random.uniform(0, 30)
     elif state == "drowsy":
         theta_power = random.uniform(0.5, 0.7)
         alpha_power = random.uniform(0.4, 0.6)
-        theta_alpha_ratio = theta_power / alpha_power
         fatigue_score = random.uniform(40, 70)
     else:  # fatigued
         theta_power = random.uniform(0.7, 0.9)
         alpha_power = random.uniform(0.2, 0.4)
-        theta_alpha_ratio = theta_power / alpha_power
         fatigue_score = random.uniform(70, 95)
     
-    return {
-        "session_id": SESSION_ID,
-        "timestamp": datetime.now().isoformat() + "Z",
-        "sample_rate": SAMPLE_RATE,
-        "channels": {
-            "TP9": round(base_tp9, 3),
-            "AF7": round(base_af7, 3),
-            "AF8": round(base_af8, 3),
-            "TP10": round(base_tp10, 3)
-        },
-        "processed": {
-            "theta_power": round(theta_power, 2),
-            "alpha_power": round(alpha_power, 2),
-            "theta_alpha_ratio": round(theta_alpha_ratio, 2),
-            "fatigue_score": round(fatigue_score, 2)
-        },
-        "save_to_db": False  # Set to True to save to database
-    }
-
-
-def send_eeg_stream(duration_seconds=30):
+    _PROCESSED["theta_power"] = theta_power
+    _PROCESSED["alpha_power"] = alpha_power
+    _PROCESSED["theta_alpha_ratio"] = theta_power / alpha_power
+    _PROCESSED["fatigue_score"] = fatigue_score
+    _TEMPLATE["timestamp"] = _timestamp()
+    
+    return _TEMPLATE
+
+
+async def send_eeg_stream(duration_seconds=30):
     """
     Send continuous EEG stream for testing
     
+    Uses a single long-lived HTTP/2 connection and drift-compensated
+    scheduling so the achieved rate tracks SAMPLE_RATE.
+    
     Args:
         duration_seconds: How long to stream data
     """
@@ -91,55 +117,65 @@ def send_eeg_stream(duration_seconds=30):
     errors = 0
     start_time = time.time()
     
-    try:
-        while (time.time() - start_time) < duration_seconds:
-            # Generate mock data
-            eeg_data = generate_mock_eeg_sample()
-            
-            # Send to backend
-            try:
-                response = requests.post(endpoint, json=eeg_data, timeout=0.5)
+    loop = asyncio.get_running_loop()
+    next_tick = loop.time()
+    
+    limits = httpx.Limits(max_keepalive_connections=1)
+    async with httpx.AsyncClient(http2=True, limits=limits, timeout=0.5) as client:
+        try:
+            while (time.time() - start_time) < duration_seconds:
+                # Generate mock data
+                eeg_data = generate_mock_eeg_sample()
                 
-                if response.status_code == 200:
-                    samples_sent += 1
-                    result = response.json()
-                    clients = result.get("clients_notified", 0)
+                # Send to backend
+                try:
+                    response = await client.post(
+                        endpoint, content=orjson.dumps(eeg_data), headers=JSON_HEADERS
+                    )
+                    
+                    if response.status_code == 200:
+                        samples_sent += 1
+                        result = response.json()
+                        clients = result.get("clients_notified", 0)
+                        
+                        # Print progress every 256 samples (1 second)
+                        if samples_sent % 256 == 0:
+                            elapsed = time.time() - start_time
+                            print(
+                                f"✅ Sent {samples_sent} samples | "
+                                f"Clients: {clients} | "
+                                f"Fatigue: {eeg_data['processed']['fatigue_score']:.1f}% | "
+                                f"Elapsed: {elapsed:.1f}s"
+                            )
+                    else:
+                        errors += 1
+                        print(f"❌ Error: {response.status_code} - {response.text}")
                     
-                    # Print progress every 256 samples (1 second)
-                    if samples_sent % 256 == 0:
-                        elapsed = time.time() - start_time
-                        print(
-                            f"✅ Sent {samples_sent} samples | "
-                            f"Clients: {clients} | "
-                            f"Fatigue: {eeg_data['processed']['fatigue_score']:.1f}% | "
-                            f"Elapsed: {elapsed:.1f}s"
-                        )
-                else:
+                except httpx.HTTPError as e:
                     errors += 1
-                    print(f"❌ Error: {response.status_code} - {response.text}")
+                    if errors < 5:  # Only show first few errors
+                        print(f"❌ Request failed: {e}")
                 
-            except requests.exceptions.RequestException as e:
-                errors += 1
-                if errors < 5:  # Only show first few errors
-                    print(f"❌ Request failed: {e}")
-            
-            # Wait for next sample
-            time.sleep(SEND_INTERVAL)
-    
-    except KeyboardInterrupt:
-        print("\n⚠️  Stream interrupted by user")
-    
-    finally:
-        elapsed_time = time.time() - start_time
-        actual_rate = samples_sent / elapsed_time if elapsed_time > 0 else 0
+                # Wait for next sample (scheduled from the previous tick, not from now)
+                next_tick += SEND_INTERVAL
+                delay = next_tick - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+        
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            print("\n⚠️  Stream interrupted by user")
         
-        print("-" * 60)
-        print(f"📊 Stream Summary:")
-        print(f"   Samples sent: {samples_sent}")
-        print(f"   Errors: {errors}")
-        print(f"   Duration: {elapsed_time:.2f}s")
-        print(f"   Actual rate: {actual_rate:.1f} Hz")
-        print(f"   Success rate: {((samples_sent / (samples_sent + errors)) * 100) if (samples_sent + errors) > 0 else 0:.1f}%")
+        finally:
+            elapsed_time = time.time() - start_time
+            actual_rate = samples_sent / elapsed_time if elapsed_time > 0 else 0
+            
+            print("-" * 60)
+            print(f"📊 Stream Summary:")
+            print(f"   Samples sent: {samples_sent}")
+            print(f"   Errors: {errors}")
+            print(f"   Duration: {elapsed_time:.2f}s")
+            print(f"   Actual rate: {actual_rate:.1f} Hz")
+            print(f"   Success rate: {((samples_sent / (samples_sent + errors)) * 100) if (samples_sent + errors) > 0 else 0:.1f}%")
 
 
 def check_eeg_status():
@@ -147,7 +183,7 @@ def check_eeg_status():
     endpoint = f"{BASE_URL}/api/v1/eeg/status"
     
     try:
-        response = requests.get(endpoint)
+        response = httpx.get(endpoint)
         if response.status_code == 200:
             status = response.json()
             print("📊 EEG Status:")
@@ -187,4 +223,7 @@ if __name__ == "__main__":
     print()
     
     # Start streaming
-    send_eeg_stream(duration_seconds=60)  # Stream for 60 seconds
+    try:
+        asyncio.run(send_eeg_stream(duration_seconds=60))  # Stream for 60 seconds
+    except KeyboardInterrupt:
+        pass
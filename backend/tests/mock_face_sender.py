@@ -6,11 +6,13 @@ This script is for testing the face detection API endpoints
 Week 3, Wednesday - Testing Tool
 """
 
-import requests
+import asyncio
+import httpx
+import numpy as np
+import orjson
 import time
-import random
 from datetime import datetime
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 
 # Configuration
@@ -18,6 +20,89 @@ BASE_URL = "http://localhost:8000"
 SESSION_ID = "145c3fc1-0e68-4570-92e3-236f3a40febf"  # Replace with real session ID
 SEND_RATE = 30  # FPS (MediaPipe default)
 SEND_INTERVAL = 1.0 / SEND_RATE
+MAX_IN_FLIGHT = 8  # Outstanding POSTs allowed before the sender waits
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Validated once (fails fast on a malformed ID) and embedded as
+# pre-encoded JSON, so orjson copies it verbatim on every frame
+_SESSION_ID_JSON = orjson.Fragment(orjson.dumps(str(UUID(SESSION_ID))))
+
+# Payload skeleton built once; each frame is a shallow copy with the
+# per-frame fields filled in from the prefill buffers (a copy, because requests are in flight
+# concurrently and still reference earlier frames)
+_TEMPLATE = {
+    "session_id": _SESSION_ID_JSON,
+    "timestamp": "",
+    "eye_aspect_ratio": 0.0,
+    "mouth_aspect_ratio": 0.0,
+    "eyes_closed": False,
+    "yawning": False,
+    "blink_count": 0,
+    "blink_rate": 0.0,
+    "head_yaw": 0.0,
+    "head_pitch": 0.0,
+    "head_roll": 0.0,
+    "face_fatigue_score": 0.0
+}
+
+
+# Random frame values are drawn in vectorized batches of PREFILL_SIZE and
+# handed out one frame at a time
+PREFILL_SIZE = 1024
+_RNG = np.random.default_rng()
+_prefill = {}
+_cursor = PREFILL_SIZE  # Forces a refill on first use
+
+# Per-state parameters, indexed by level: 0 = alert, 1 = drowsy, 2 = fatigued
+# Eye Aspect Ratio (EAR)
+# Alert: 0.25-0.35, Drowsy: 0.15-0.25, Fatigued: 0.05-0.15
+_EAR_RANGE = (np.array([0.25, 0.15, 0.05]), np.array([0.35, 0.25, 0.15]))
+_BLINK_RATE_RANGE = (np.array([10.0, 25.0, 5.0]), np.array([20.0, 40.0, 15.0]))
+_FATIGUE_RANGE = (np.array([0.0, 40.0, 70.0]), np.array([30.0, 70.0, 95.0]))
+_EYES_CLOSED_PROB = np.array([0.0, 1 / 2, 2 / 3])
+
+# Hot-path callables bound once instead of looked up on every frame
+_now = datetime.now
+_prefill_items = _prefill.items
+
+
+def _round(values, decimals):
+    """Round half-up and convert to Python scalars"""
+    scale = 10.0 ** decimals
+    return (np.floor(values * scale + 0.5) / scale).tolist()
+
+
+def _refill():
+    """Draw the next PREFILL_SIZE frames' worth of random values"""
+    global _cursor
+    n = PREFILL_SIZE
+    
+    # Simulates different states: alert (2x weight), drowsy, fatigued
+    level = np.maximum(_RNG.integers(0, 4, n) - 1, 0)
+    
+    def per_state(value_range):
+        low, high = value_range
+        return _RNG.uniform(low[level], high[level])
+    
+    # Mouth Aspect Ratio (MAR)
+    yawning = _RNG.random(n) < 0.05  # 5% chance of yawning
+    mar = np.where(yawning, _RNG.uniform(0.5, 0.8, n), _RNG.uniform(0.1, 0.4, n))
+    
+    _prefill.update({
+        "eye_aspect_ratio": _round(per_state(_EAR_RANGE), 3),
+        "mouth_aspect_ratio": _round(mar, 3),
+        "eyes_closed": (_RNG.random(n) < _EYES_CLOSED_PROB[level]).tolist(),
+        "yawning": yawning.tolist(),
+        # Cumulative blink count (increases over time)
+        "blink_count": _RNG.integers(0, 101, n).tolist(),
+        "blink_rate": _round(per_state(_BLINK_RATE_RANGE), 1),
+        # Head pose
+        "head_yaw": _round(_RNG.uniform(-0.2, 0.2, n), 3),
+        "head_pitch": _round(_RNG.uniform(-0.15, 0.1, n), 3),
+        "head_roll": _round(_RNG.uniform(-0.1, 0.1, n), 3),
+        "face_fatigue_score": _round(per_state(_FATIGUE_RANGE), 1),
+    })
+    _cursor = 0
 
 
 def generate_mock_face_data():
@@ -26,58 +111,36 @@ def generate_mock_face_data():
     
     Simulates different states: alert, drowsy, fatigued
     """
-    state = random.choice(["alert", "alert", "drowsy", "fatigued"])
-    
-    # Eye Aspect Ratio (EAR)
-    # Alert: 0.25-0.35, Drowsy: 0.15-0.25, Fatigued: 0.05-0.15
-    if state == "alert":
-        ear = random.uniform(0.25, 0.35)
-        eyes_closed = False
-        blink_rate = random.uniform(10, 20)
-        fatigue_score = random.uniform(0, 30)
-    elif state == "drowsy":
-        ear = random.uniform(0.15, 0.25)
-        eyes_closed = random.choice([True, False])
-        blink_rate = random.uniform(25, 40)
-        fatigue_score = random.uniform(40, 70)
-    else:  # fatigued
-        ear = random.uniform(0.05, 0.15)
-        eyes_closed = random.choice([True, True, False])
-        blink_rate = random.uniform(5, 15)
-        fatigue_score = random.uniform(70, 95)
+    global _cursor
+    if _cursor >= PREFILL_SIZE:
+        _refill()
+    i = _cursor
+    _cursor += 1
     
-    # Mouth Aspect Ratio (MAR)
-    yawning = random.random() < 0.05  # 5% chance of yawning
-    mar = random.uniform(0.5, 0.8) if yawning else random.uniform(0.1, 0.4)
-    
-    # Head pose
-    head_yaw = random.uniform(-0.2, 0.2)
-    head_pitch = random.uniform(-0.15, 0.1)
-    head_roll = random.uniform(-0.1, 0.1)
-    
-    # Cumulative blink count (increases over time)
-    blink_count = random.randint(0, 100)
-    
-    return {
-        "session_id": SESSION_ID,
-        "timestamp": datetime.now().isoformat() + "Z",
-        "eye_aspect_ratio": round(ear, 3),
-        "mouth_aspect_ratio": round(mar, 3),
-        "eyes_closed": eyes_closed,
-        "yawning": yawning,
-        "blink_count": blink_count,
-        "blink_rate": round(blink_rate, 1),
-        "head_yaw": round(head_yaw, 3),
-        "head_pitch": round(head_pitch, 3),
-        "head_roll": round(head_roll, 3),
-        "face_fatigue_score": round(fatigue_score, 1)
-    }
-
-
-def send_face_stream(duration_seconds=30):
+    face_data = _TEMPLATE.copy()
+    face_data["timestamp"] = _now().isoformat() + "Z"
+    for key, values in _prefill_items():
+        face_data[key] = values[i]
+    
+    return face_data
+
+
+async def _post_face_event(client, endpoint, face_data):
+    """POST one face event, returning the payload alongside the response"""
+    response = await client.post(
+        endpoint, content=orjson.dumps(face_data), headers=JSON_HEADERS
+    )
+    return face_data, response
+
+
+async def send_face_stream(duration_seconds=30):
     """
     Send continuous face detection stream for testing
     
+    Requests are pipelined over a pooled httpx.AsyncClient: up to
+    MAX_IN_FLIGHT POSTs may be outstanding, so a slow response does not
+    delay the next frame.
+    
     Args:
         duration_seconds: How long to stream data
     """
@@ -93,54 +156,91 @@ def send_face_stream(duration_seconds=30):
     samples_sent = 0
     errors = 0
     start_time = time.time()
+    in_flight = set()
     
-    try:
-        while (time.time() - start_time) < duration_seconds:
-            # Generate mock data
-            face_data = generate_mock_face_data()
+    def record_result(task):
+        nonlocal samples_sent, errors
+        try:
+            face_data, response = task.result()
+        except httpx.HTTPError as e:
+            errors += 1
+            if errors < 5:  # Only show first few errors
+                print(f"❌ Request failed: {e}")
+            return
+        
+        if response.status_code == 201:
+            samples_sent += 1
             
-            # Send to backend
-            try:
-                response = requests.post(endpoint, json=face_data, timeout=0.5)
+            # Print progress every 30 samples (1 second at 30 FPS)
+            if samples_sent % 30 == 0:
+                elapsed = time.time() - start_time
+                print(
+                    f"✅ Sent {samples_sent} events | "
+                    f"EAR: {face_data['eye_aspect_ratio']:.2f} | "
+                    f"Fatigue: {face_data['face_fatigue_score']:.1f}% | "
+                    f"Elapsed: {elapsed:.1f}s"
+                )
+        else:
+            errors += 1
+            print(f"❌ Error: {response.status_code} - {response.text}")
+    
+    loop = asyncio.get_running_loop()
+    next_tick = loop.time()
+    
+    limits = httpx.Limits(max_connections=MAX_IN_FLIGHT)
+    async with httpx.AsyncClient(limits=limits, timeout=0.5) as client:
+        try:
+            while (time.time() - start_time) < duration_seconds:
+                # Generate mock data and fire the request without awaiting it
+                face_data = generate_mock_face_data()
+                in_flight.add(asyncio.create_task(
+                    _post_face_event(client, endpoint, face_data)
+                ))
                 
-                if response.status_code == 201:
-                    samples_sent += 1
-                    
-                    # Print progress every 30 samples (1 second at 30 FPS)
-                    if samples_sent % 30 == 0:
-                        elapsed = time.time() - start_time
-                        print(
-                            f"✅ Sent {samples_sent} events | "
-                            f"EAR: {face_data['eye_aspect_ratio']:.2f} | "
-                            f"Fatigue: {face_data['face_fatigue_score']:.1f}% | "
-                            f"Elapsed: {elapsed:.1f}s"
-                        )
-                else:
-                    errors += 1
-                    print(f"❌ Error: {response.status_code} - {response.text}")
+                # Collect finished requests; only block when the pipeline is full
+                done = {task for task in in_flight if task.done()}
+                if len(in_flight) - len(done) >= MAX_IN_FLIGHT:
+                    done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                in_flight -= done
+                for task in done:
+                    record_result(task)
                 
-            except requests.exceptions.RequestException as e:
-                errors += 1
-                if errors < 5:  # Only show first few errors
-                    print(f"❌ Request failed: {e}")
+                # Wait for next sample (scheduled from the previous tick, not from now)
+                next_tick += SEND_INTERVAL
+                delay = next_tick - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
             
-            # Wait for next sample
-            time.sleep(SEND_INTERVAL)
-    
-    except KeyboardInterrupt:
-        print("\n⚠️  Stream interrupted by user")
-    
-    finally:
-        elapsed_time = time.time() - start_time
-        actual_rate = samples_sent / elapsed_time if elapsed_time > 0 else 0
+            # Let outstanding requests finish before reporting
+            if in_flight:
+                done, _ = await asyncio.wait(in_flight)
+                in_flight.clear()
+                for task in done:
+                    record_result(task)
         
-        print("-" * 60)
-        print(f"📊 Stream Summary:")
-        print(f"   Events sent: {samples_sent}")
-        print(f"   Errors: {errors}")
-        print(f"   Duration: {elapsed_time:.2f}s")
-        print(f"   Actual rate: {actual_rate:.1f} FPS")
-        print(f"   Success rate: {((samples_sent / (samples_sent + errors)) * 100) if (samples_sent + errors) > 0 else 0:.1f}%")
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            print("\n⚠️  Stream interrupted by user")
+            for task in in_flight:
+                task.cancel()
+            # Let the cancelled requests unwind before the client closes;
+            # count the ones that finished before the cancel landed
+            await asyncio.gather(*in_flight, return_exceptions=True)
+            for task in in_flight:
+                if not task.cancelled():
+                    record_result(task)
+            in_flight.clear()
+        
+        finally:
+            elapsed_time = time.time() - start_time
+            actual_rate = samples_sent / elapsed_time if elapsed_time > 0 else 0
+            
+            print("-" * 60)
+            print(f"📊 Stream Summary:")
+            print(f"   Events sent: {samples_sent}")
+            print(f"   Errors: {errors}")
+            print(f"   Duration: {elapsed_time:.2f}s")
+            print(f"   Actual rate: {actual_rate:.1f} FPS")
+            print(f"   Success rate: {((samples_sent / (samples_sent + errors)) * 100) if (samples_sent + errors) > 0 else 0:.1f}%")
 
 
 def check_face_stats():
@@ -148,7 +248,7 @@ def check_face_stats():
     endpoint = f"{BASE_URL}/api/v1/face/stats/{SESSION_ID}"
     
     try:
-        response = requests.get(endpoint)
+        response = httpx.get(endpoint)
         if response.status_code == 200:
             stats = response.json()
             print("📊 Face Detection Statistics:")
@@ -183,7 +283,10 @@ if __name__ == "__main__":
     print()
     
     # Start streaming
-    send_face_stream(duration_seconds=30)  # Stream for 30 seconds
+    try:
+        asyncio.run(send_face_stream(duration_seconds=30))  # Stream for 30 seconds
+    except KeyboardInterrupt:
+        pass
     
     print()
     check_face_stats()
@@ -6,62 +6,103 @@ Tests the /ws/ping endpoint to measure round trip time
 """
 
 import asyncio
+import numpy as np
 import websockets
-import json
-from datetime import datetime
-import statistics
+import orjson
+import time
 
-async def test_websocket_latency(url: str = "ws://localhost:8000/api/v1/ws/ping", num_pings: int = 100):
+async def run_pings(websocket, num_pings: int = 100, send_interval: float = 0.0) -> list:
     """
-    Test WebSocket latency by sending ping messages
+    Measure round-trip latency over an already-open /ws/ping connection
+    
+    Pings are pipelined: a sender task keeps writing without waiting for
+    each pong, and a receiver task matches pongs to their send time via the
+    echoed client_timestamp. This measures steady-state latency with the
+    link busy rather than single-in-flight round trips.
+    
+    The connection is left open, so several runs can share one handshake.
     
     Args:
-        url: WebSocket endpoint URL
+        websocket: Open connection whose "ready" message was already consumed
         num_pings: Number of pings to send
+        send_interval: Gap between pings in seconds (0 = as fast as possible)
+    
+    Returns:
+        Latencies in milliseconds, in the order pongs arrived
     """
     latencies = []
     
-    async with websockets.connect(url) as websocket:
-        # Wait for ready message
-        ready = await websocket.recv()
-        print(f"Server ready: {ready}\n")
-        
-        print(f"Sending {num_pings} pings...")
-        
+    # Outstanding pings: ping id (echoed back as client_timestamp) -> send time (ns)
+    send_times: dict[str, int] = {}
+    
+    async def sender():
+        for i in range(num_pings):
+            # Serialize before taking the send time so encoding isn't
+            # counted as latency; the server reads text frames, hence decode()
+            ping_id = str(i)
+            payload = orjson.dumps({"type": "ping", "client_timestamp": ping_id}).decode()
+            send_times[ping_id] = time.perf_counter_ns()
+            await websocket.send(payload)
+            await asyncio.sleep(send_interval)
+    
+    async def receiver():
         for i in range(num_pings):
-            # Send ping with timestamp
-            client_timestamp = datetime.utcnow().isoformat()
-            ping_message = {
-                "type": "ping",
-                "client_timestamp": client_timestamp
-            }
-            
-            send_time = datetime.utcnow()
-            await websocket.send(json.dumps(ping_message))
-            
             # Receive pong
             pong = await websocket.recv()
-            receive_time = datetime.utcnow()
+            receive_ns = time.perf_counter_ns()
+            
+            send_ns = send_times.pop(orjson.loads(pong).get("client_timestamp"), None)
+            if send_ns is None:
+                continue
             
             # Calculate latency
-            latency_ms = (receive_time - send_time).total_seconds() * 1000
+            latency_ms = (receive_ns - send_ns) / 1e6
             latencies.append(latency_ms)
             
             # Print progress every 10 pings
             if (i + 1) % 10 == 0:
                 print(f"  Ping {i + 1}/{num_pings}: {latency_ms:.2f}ms")
+    
+    await asyncio.gather(sender(), receiver())
+    return latencies
+
+
+async def test_websocket_latency(
+    url: str = "ws://localhost:8000/api/v1/ws/ping",
+    num_pings: int = 100,
+    send_interval: float = 0.0
+):
+    """
+    Test WebSocket latency by sending ping messages
+    
+    Args:
+        url: WebSocket endpoint URL
+        num_pings: Number of pings to send
+        send_interval: Gap between pings in seconds (0 = as fast as possible)
+    """
+    async with websockets.connect(url) as websocket:
+        # Wait for ready message
+        ready = await websocket.recv()
+        print(f"Server ready: {ready}\n")
         
-        # Calculate statistics
-        print("\n" + "=" * 60)
-        print("LATENCY STATISTICS")
-        print("=" * 60)
-        print(f"Total pings:        {num_pings}")
-        print(f"Min latency:        {min(latencies):.2f}ms")
-        print(f"Max latency:        {max(latencies):.2f}ms")
-        print(f"Average latency:    {statistics.mean(latencies):.2f}ms")
-        print(f"Median latency:     {statistics.median(latencies):.2f}ms")
-        print(f"Std deviation:      {statistics.stdev(latencies):.2f}ms")
-        print("=" * 60)
+        print(f"Sending {num_pings} pings...")
+        latencies = await run_pings(websocket, num_pings, send_interval)
+    
+    # Calculate statistics
+    arr = np.asarray(latencies)
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    print("\n" + "=" * 60)
+    print("LATENCY STATISTICS")
+    print("=" * 60)
+    print(f"Total pings:        {arr.size}/{num_pings}")
+    print(f"Min latency:        {arr.min():.2f}ms")
+    print(f"Max latency:        {arr.max():.2f}ms")
+    print(f"Average latency:    {arr.mean():.2f}ms")
+    print(f"Median latency:     {p50:.2f}ms")
+    print(f"P95 latency:        {p95:.2f}ms")
+    print(f"P99 latency:        {p99:.2f}ms")
+    print(f"Std deviation:      {arr.std(ddof=1):.2f}ms")
+    print("=" * 60)
 
 if __name__ == "__main__":
     try:
@@ -13,6 +13,7 @@ Modify these values to adjust system behavior.
 STREAM_TYPE = "EEG"
 STREAM_TIMEOUT = 20          # seconds to wait for LSL stream
 MAX_CHUNK_LENGTH = 12        # samples per chunk
+LSL_MAX_BUFLEN = 8           # seconds buffered by the server's inlet before dropping oldest samples
 
 # Muse 2 channel labels
 CHANNEL_LABELS = ["TP9", "AF7", "AF8", "TP10", "AUX"]
@@ -68,6 +69,8 @@ RECORDING_FORMAT = "csv"     # Options: csv, edf
 # ===========================
 BACKEND_URL = "http://localhost:8000"       # Backend URL
 EEG_ENDPOINT = "/api/v1/eeg/stream"         # EEG streaming endpoint (HTTP POST)
+EEG_BATCH_ENDPOINT = "/api/v1/eeg/stream/batch"  # Several stream payloads per POST
+SEND_BATCH_SIZE = 4                         # Max payloads merged per POST when backend lags
 SAVE_TO_DB = False                          # Save to database by default
 
 # WebSocket endpoint (untuk referensi - tidak digunakan oleh server.py)
@@ -7,14 +7,32 @@ Menampilkan RAW metrics untuk memahami pattern EEG sebenarnya.
 Jalankan: python debug_states.py
 """
 
+import queue
+import threading
 import time
 import numpy as np
-from collections import deque
+from collections import ChainMap, deque
 
 from eeg.acquisition import EEGAcquisition
 from eeg.preprocessing import EEGPreprocessor
 from eeg.features import EEGFeatureExtractor
 from eeg.analysis import CognitiveAnalyzer
+from eeg.jit import njit
+
+
+# Last formatted wall-clock second, reused until the second changes
+_clock_sec = -1
+_clock_str = ""
+
+
+def _clock() -> str:
+    """Current local time as HH:MM:SS"""
+    global _clock_sec, _clock_str
+    sec = int(time.time())
+    if sec != _clock_sec:
+        _clock_sec = sec
+        _clock_str = time.strftime('%H:%M:%S', time.localtime(sec))
+    return _clock_str
 
 
 def print_header():
@@ -23,25 +41,53 @@ def print_header():
     print("=" * 80)
 
 
+def _stack_features(features: dict, keys: tuple):
+    """Stack the available per-channel feature arrays into (n_keys, channels)."""
+    present = [k for k in keys if k in features]
+    if not present:
+        return present, np.empty((0, 0))
+    return present, np.stack([features[k] for k in present])
+
+
 def print_raw_bands(features: dict):
     """Print raw band power values."""
-    bands = ["theta", "alpha", "beta", "delta", "gamma"]
-    print("\n  📊 RAW BAND POWER (per channel):")
-    for band in bands:
-        if band in features:
-            values = features[band]
-            avg = np.mean(values)
-            print(f"     {band:6s}: {avg:8.4f}  │ channels: {[f'{v:.4f}' for v in values]}")
+    bands, values = _stack_features(features, ("theta", "alpha", "beta", "delta", "gamma"))
+    means = values.mean(axis=1) if bands else []
+    lines = ["\n  📊 RAW BAND POWER (per channel):"]
+    lines += [
+        f"     {band:6s}: {avg:8.4f}  │ channels: {[f'{v:.4f}' for v in row]}"
+        for band, avg, row in zip(bands, means, values.tolist())
+    ]
+    print("\n".join(lines))
 
 
 def print_ratios(features: dict):
     """Print ratio calculations."""
-    print("\n  📈 RATIO CALCULATIONS:")
-    for ratio in ["theta_alpha", "beta_alpha", "alpha_beta"]:
-        if ratio in features:
-            values = features[ratio]
-            avg = np.mean(values)
-            print(f"     {ratio:12s}: {avg:6.3f}  │ per ch: {[f'{v:.3f}' for v in values]}")
+    ratios, values = _stack_features(features, ("theta_alpha", "beta_alpha", "alpha_beta"))
+    means = values.mean(axis=1) if ratios else []
+    lines = ["\n  📈 RATIO CALCULATIONS:"]
+    lines += [
+        f"     {ratio:12s}: {avg:6.3f}  │ per ch: {[f'{v:.3f}' for v in row]}"
+        for ratio, avg, row in zip(ratios, means, values.tolist())
+    ]
+    print("\n".join(lines))
+
+
+_METRICS_TMPL = (
+    "\n  🧮 NORMALIZED METRICS (after baseline):\n"
+    "     θ/α normalized: {theta_alpha:.3f}\n"
+    "     β/α normalized: {beta_alpha:.3f}\n"
+    "     α/β normalized: {alpha_beta:.3f}"
+)
+_METRICS_DEFAULTS = {"theta_alpha": 0, "beta_alpha": 0, "alpha_beta": 0}
+
+_DEBUG_TMPL = (
+    "\n  ℹ️  DEBUG INFO:\n"
+    "     Variability: {variability:.3f}\n"
+    "     Stability: {stability:.2f}\n"
+    "     Calibrated: {calibrated}"
+)
+_DEBUG_DEFAULTS = {"variability": 0, "stability": 0, "calibrated": False}
 
 
 def print_analysis_detail(result: dict, baseline: dict):
@@ -50,71 +96,128 @@ def print_analysis_detail(result: dict, baseline: dict):
     scores = result.get('scores', {})
     debug_info = result.get('debug', {})
     
-    print("\n  🧮 NORMALIZED METRICS (after baseline):")
-    print(f"     θ/α normalized: {metrics.get('theta_alpha', 0):.3f}")
-    print(f"     β/α normalized: {metrics.get('beta_alpha', 0):.3f}")
-    print(f"     α/β normalized: {metrics.get('alpha_beta', 0):.3f}")
+    lines = [_METRICS_TMPL.format_map(ChainMap(metrics, _METRICS_DEFAULTS))]
     
-    print("\n  📍 YOUR BASELINE (from calibration):")
-    for k, v in baseline.items():
-        print(f"     {k}: {v:.3f}")
+    lines.append("\n  📍 YOUR BASELINE (from calibration):")
+    lines.extend("     %s: %.3f" % item for item in baseline.items())
     
-    print("\n  🎯 STATE SCORES:")
+    lines.append("\n  🎯 STATE SCORES:")
     for state, score in sorted(scores.items(), key=lambda x: -x[1]):
-        bar = "█" * int(score * 20)
-        print(f"     {state:8s}: {score:.0%} {bar}")
+        lines.append(f"     {state:8s}: {score:.0%} {'█' * int(score * 20)}")
     
-    print("\n  ℹ️  DEBUG INFO:")
-    print(f"     Variability: {debug_info.get('variability', 0):.3f}")
-    print(f"     Stability: {debug_info.get('stability', 0):.2f}")
-    print(f"     Calibrated: {debug_info.get('calibrated', False)}")
+    lines.append(_DEBUG_TMPL.format_map(ChainMap(debug_info, _DEBUG_DEFAULTS)))
+    print("\n".join(lines))
 
 
-def analyze_issue(features: dict, result: dict, baseline: dict):
-    """Analyze potential issues based on the data."""
-    issues = []
-    
-    # Get raw values
-    theta_raw = np.mean(features.get("theta", [0]))
-    alpha_raw = np.mean(features.get("alpha", [0]))
-    beta_raw = np.mean(features.get("beta", [0]))
-    
-    theta_alpha_raw = np.mean(features.get("theta_alpha", [1]))
-    beta_alpha_raw = np.mean(features.get("beta_alpha", [1]))
-    alpha_beta_raw = np.mean(features.get("alpha_beta", [1]))
+# Issue bits set by _analyze_core, in report order
+_ISSUE_HIGH_ALPHA = 1 << 0
+_ISSUE_BASELINE_THETA_ALPHA = 1 << 1
+_ISSUE_BASELINE_ALPHA_BETA = 1 << 2
+_ISSUE_THETA_SPIKE = 1 << 3
+_ISSUE_BETA_DOMINANT = 1 << 4
+_ISSUE_FATIGUE_ANOMALY = 1 << 5
+_ISSUE_FOCUSED_ANOMALY = 1 << 6
+
+_ISSUE_MESSAGES = (
+    (_ISSUE_HIGH_ALPHA, (
+        "⚡ HIGH ALPHA detected - kemungkinan mata tertutup/rileks",
+        "   → Ini bisa menyebabkan RELAXED terdeteksi, bukan FATIGUE",
+    )),
+    (_ISSUE_BASELINE_THETA_ALPHA, (
+        "⚠️  BASELINE θ/α tinggi - calibration mungkin dilakukan saat ngantuk",
+    )),
+    (_ISSUE_BASELINE_ALPHA_BETA, (
+        "⚠️  BASELINE α/β tinggi - calibration mungkin dilakukan saat terlalu rileks",
+    )),
+    (_ISSUE_THETA_SPIKE, (
+        "💤 THETA SPIKE - indikasi drowsiness yang kuat",
+    )),
+    (_ISSUE_BETA_DOMINANT, (
+        "🔥 BETA DOMINANT - seharusnya FOCUSED atau STRESS",
+    )),
+    (_ISSUE_FATIGUE_ANOMALY, (
+        "❓ ANOMALY: State=FATIGUE tapi Beta > Theta",
+        "   → Kemungkinan false positive, cek signal quality",
+    )),
+    (_ISSUE_FOCUSED_ANOMALY, (
+        "❓ ANOMALY: State=FOCUSED tapi Alpha > Beta",
+        "   → Seharusnya RELAXED, threshold mungkin perlu adjustment",
+    )),
+)
+
+# State codes understood by _analyze_core (anything else is 0)
+_STATE_FATIGUE = 1
+_STATE_FOCUSED = 2
+_STATE_CODES = {"fatigue": _STATE_FATIGUE, "focused": _STATE_FOCUSED}
+
+
+@njit(cache=True)
+def _mean(values):
+    total = 0.0
+    for v in values:
+        total += v
+    return total / len(values) if len(values) > 0 else 0.0
+
+
+@njit(cache=True)
+def _analyze_core(
+    theta, alpha, beta, alpha_beta,
+    baseline_theta_alpha, baseline_alpha_beta, state_code
+):
+    """Evaluate all issue checks and return them as a bitmask."""
+    theta_raw = _mean(theta)
+    alpha_raw = _mean(alpha)
+    beta_raw = _mean(beta)
+    alpha_beta_raw = _mean(alpha_beta)
     
-    metrics = result.get('metrics', {})
-    state = result.get('state', 'unknown')
+    issues = 0
     
     # Check for high alpha (eyes closed pattern)
     if alpha_raw > 0.5 and alpha_beta_raw > 1.5:
-        issues.append("⚡ HIGH ALPHA detected - kemungkinan mata tertutup/rileks")
-        issues.append("   → Ini bisa menyebabkan RELAXED terdeteksi, bukan FATIGUE")
+        issues |= _ISSUE_HIGH_ALPHA
     
     # Check baseline issues
-    if baseline.get('theta_alpha', 1) > 1.3:
-        issues.append("⚠️  BASELINE θ/α tinggi - calibration mungkin dilakukan saat ngantuk")
-    
-    if baseline.get('alpha_beta', 1) > 1.3:
-        issues.append("⚠️  BASELINE α/β tinggi - calibration mungkin dilakukan saat terlalu rileks")
+    if baseline_theta_alpha > 1.3:
+        issues |= _ISSUE_BASELINE_THETA_ALPHA
+    if baseline_alpha_beta > 1.3:
+        issues |= _ISSUE_BASELINE_ALPHA_BETA
     
     # Check for theta spike
     if theta_raw > alpha_raw * 1.5:
-        issues.append("💤 THETA SPIKE - indikasi drowsiness yang kuat")
+        issues |= _ISSUE_THETA_SPIKE
     
     # Check for beta dominance
     if beta_raw > alpha_raw * 1.5:
-        issues.append("🔥 BETA DOMINANT - seharusnya FOCUSED atau STRESS")
+        issues |= _ISSUE_BETA_DOMINANT
     
     # State-specific analysis
-    if state == "fatigue" and beta_raw > theta_raw:
-        issues.append("❓ ANOMALY: State=FATIGUE tapi Beta > Theta")
-        issues.append("   → Kemungkinan false positive, cek signal quality")
+    if state_code == _STATE_FATIGUE and beta_raw > theta_raw:
+        issues |= _ISSUE_FATIGUE_ANOMALY
+    if state_code == _STATE_FOCUSED and alpha_raw > beta_raw:
+        issues |= _ISSUE_FOCUSED_ANOMALY
+    
+    return issues
+
+
+def analyze_issue(features: dict, result: dict, baseline: dict):
+    """Analyze potential issues based on the data."""
+    def as_array(key, default):
+        return np.asarray(features.get(key, [default]), dtype=np.float64)
     
-    if state == "focused" and alpha_raw > beta_raw:
-        issues.append("❓ ANOMALY: State=FOCUSED tapi Alpha > Beta")  
-        issues.append("   → Seharusnya RELAXED, threshold mungkin perlu adjustment")
+    mask = _analyze_core(
+        as_array("theta", 0.0),
+        as_array("alpha", 0.0),
+        as_array("beta", 0.0),
+        as_array("alpha_beta", 1.0),
+        float(baseline.get('theta_alpha', 1)),
+        float(baseline.get('alpha_beta', 1)),
+        _STATE_CODES.get(result.get('state', 'unknown'), 0),
+    )
     
+    issues = []
+    for bit, messages in _ISSUE_MESSAGES:
+        if mask & bit:
+            issues.extend(messages)
     return issues
 
 
@@ -149,9 +252,27 @@ def main():
     print("\n[CALIBRATION] Memulai kalibras...\n")
     analyzer.start_calibration()
     
-    for i in range(5):
-        print(f"  Mengumpulkan sample {i+1}/5...")
-        raw_data, _ = eeg.pull_chunk(duration=2.0)
+    # Acquisition runs in a producer thread so each chunk is processed
+    # while the next one is still being recorded
+    n_samples = 5
+    raw_queue = queue.Queue(maxsize=2)
+    
+    def acquire():
+        try:
+            for i in range(n_samples):
+                print(f"  Mengumpulkan sample {i+1}/{n_samples}...")
+                # copy=True: the chunk is consumed after the next pull starts
+                raw_queue.put(eeg.pull_chunk(duration=2.0, copy=True)[0])
+        except Exception as e:
+            raw_queue.put(e)
+    
+    producer = threading.Thread(target=acquire, name="calibration-acquire", daemon=True)
+    producer.start()
+    
+    for _ in range(n_samples):
+        raw_data = raw_queue.get()
+        if isinstance(raw_data, Exception):
+            raise raw_data
         
         if raw_data.size > 0:
             clean_data, quality = preprocessor.process(raw_data)
@@ -159,6 +280,8 @@ def main():
                 features = extractor.extract(clean_data)
                 analyzer.add_calibration_sample(features)
     
+    producer.join()
+    
     print("\n[INFO] Kalibras selesai!")
     print(f"  Baseline θ/α: {analyzer.baseline['theta_alpha']:.3f}")
     print(f"  Baseline β/α: {analyzer.baseline['beta_alpha']:.3f}")
@@ -216,7 +339,7 @@ def main():
             # DETAILED OUTPUT
             # =========================
             print("\n" + "=" * 80)
-            print(f" ITERATION #{iteration} │ Quality: {quality:.0%} │ Time: {time.strftime('%H:%M:%S')}")
+            print(f" ITERATION #{iteration} │ Quality: {quality:.0%} │ Time: {_clock()}")
             print("=" * 80)
             
             # Final state
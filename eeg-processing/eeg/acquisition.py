@@ -7,7 +7,7 @@ Purpose : Acquire real-time EEG data for simulator-based cognitive analysis
 
 import time
 import numpy as np
-from pylsl import StreamInlet, resolve_streams
+from pylsl import StreamInlet, cf_float32, resolve_streams
 from typing import List, Tuple, Optional
 
 
@@ -16,11 +16,21 @@ class EEGAcquisition:
     EEG Acquisition handler using LSL streams.
     """
 
+    # Headroom over the nominal sample count when sizing the pull buffer
+    BUFFER_HEADROOM = 1.2
+
+    # Seconds per resolve_streams() round while waiting for the stream
+    RESOLVE_POLL_INTERVAL = 0.2
+
+    # Longest single inlet.pull_chunk() wait (seconds); also sizes each pull
+    PULL_TIMEOUT = 0.5
+
     def __init__(
         self,
         stream_type: str = "EEG",
         timeout: int = 20,
-        max_chunklen: int = 12
+        max_chunklen: int = 12,
+        max_buflen: int = 360
     ):
         """
         Initialize EEG acquisition.
@@ -33,14 +43,29 @@ class EEGAcquisition:
             Time (seconds) to wait for LSL stream
         max_chunklen : int
             Maximum samples per chunk pulled from LSL
+        max_buflen : int
+            Seconds of data LSL buffers for this inlet (default: LSL's 360).
+            When the buffer is full the oldest samples are dropped, so a
+            small value trades lost samples for bounded latency
         """
         self.stream_type = stream_type
         self.timeout = timeout
         self.max_chunklen = max_chunklen
+        self.max_buflen = max_buflen
 
         self.inlet: Optional[StreamInlet] = None
         self.channel_labels: List[str] = []
         self.sampling_rate: Optional[float] = None
+        self.n_channels: int = 0
+
+        # Preallocated pull buffers, (re)sized by _reserve()
+        self._buf = np.empty((0, 0), dtype=np.float32)
+        self._ts_buf = np.empty((0,), dtype=np.float64)
+
+        # Samples requested per inlet pull, and whether LSL can write them
+        # straight into _buf (dest_obj needs a float32 stream); set in connect()
+        self._pull_len = 0
+        self._direct_pull = False
 
     def connect(self) -> None:
         """
@@ -49,12 +74,18 @@ class EEGAcquisition:
         print("[INFO] Resolving LSL EEG stream...")
         print(f"[DEBUG] Searching for {self.timeout} seconds...")
         
-        # Use resolve_streams instead of resolve_byprop
-        all_streams = resolve_streams(wait_time=self.timeout)
+        # Use resolve_streams instead of resolve_byprop, polled in short
+        # rounds so we return as soon as the stream shows up
+        deadline = time.monotonic() + self.timeout
+        while True:
+            all_streams = resolve_streams(wait_time=self.RESOLVE_POLL_INTERVAL)
+
+            # Filter by stream type
+            streams = [s for s in all_streams if s.type() == self.stream_type]
+            if streams or time.monotonic() >= deadline:
+                break
+
         print(f"[DEBUG] Found {len(all_streams)} total stream(s)")
-        
-        # Filter by stream type
-        streams = [s for s in all_streams if s.type() == self.stream_type]
         print(f"[DEBUG] Found {len(streams)} EEG stream(s)")
 
         if not streams:
@@ -63,6 +94,7 @@ class EEGAcquisition:
         print("[DEBUG] Creating StreamInlet...")
         self.inlet = StreamInlet(
             streams[0],
+            max_buflen=self.max_buflen,
             max_chunklen=self.max_chunklen,
             recover=True
         )
@@ -77,6 +109,10 @@ class EEGAcquisition:
         print("[DEBUG] Reading channel labels...")
         n_channels = info.channel_count()
         print(f"[DEBUG] Channel count: {n_channels}")
+        self.n_channels = n_channels
+        self._direct_pull = info.channel_format() == cf_float32
+        self._pull_len = self._capacity_for(self.PULL_TIMEOUT)
+        self._reserve(self._capacity_for(1.0) + self._pull_len)
         
         # Use default Muse channel labels if reading fails
         self.channel_labels = ["TP9", "AF7", "AF8", "TP10", "AUX"][:n_channels]
@@ -85,14 +121,86 @@ class EEGAcquisition:
         print(f"          Sampling rate : {self.sampling_rate} Hz")
         print(f"          Channels      : {self.channel_labels}")
 
-    def pull_chunk(self, duration: float = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+    def _capacity_for(self, duration: float) -> int:
+        """
+        Number of samples to reserve for a pull of ``duration`` seconds.
+        """
+        return int(duration * self.sampling_rate * self.BUFFER_HEADROOM) + self.max_chunklen
+
+    def _reserve(self, n_samples: int, keep: int = 0) -> None:
+        """
+        Grow the pull buffers to hold at least ``n_samples`` samples,
+        preserving the first ``keep`` samples already written.
+        """
+        if n_samples <= self._ts_buf.shape[0]:
+            return
+
+        buf = np.empty((n_samples, self.n_channels), dtype=np.float32)
+        ts_buf = np.empty(n_samples, dtype=np.float64)
+        if keep:
+            buf[:keep] = self._buf[:keep]
+            ts_buf[:keep] = self._ts_buf[:keep]
+        self._buf, self._ts_buf = buf, ts_buf
+
+    def _pull_into(self, write_idx: int, timeout: float) -> int:
+        """
+        One inlet pull appended to the buffers at ``write_idx``.
+        Returns the number of samples received.
+        """
+        if self._ts_buf.shape[0] - write_idx < self._pull_len:
+            self._reserve(2 * self._ts_buf.shape[0], keep=write_idx)
+
+        # max_samples stays fixed: pylsl caches a ctypes buffer per
+        # distinct max_samples value
+        chunk, timestamps = self.inlet.pull_chunk(
+            timeout=timeout,
+            max_samples=self._pull_len,
+            dest_obj=self._buf[write_idx:] if self._direct_pull else None
+        )
+
+        n = len(timestamps)
+        if n:
+            end_idx = write_idx + n
+            if not self._direct_pull:
+                # Slice assignment converts the LSL lists to float32 in
+                # one pass, straight into the buffer
+                self._buf[write_idx:end_idx] = chunk
+            self._ts_buf[write_idx:end_idx] = timestamps
+        return n
+
+    def _collected(self, n: int, copy: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The first ``n`` buffered samples (views unless ``copy``).
+        """
+        if n == 0:
+            return np.empty((0, 0)), np.empty((0,))
+
+        data = self._buf[:n]
+        timestamps = self._ts_buf[:n]
+
+        if copy:
+            return data.copy(), timestamps.copy()
+        return data, timestamps
+
+    def pull_chunk(
+        self,
+        duration: float = 1.0,
+        copy: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
         Pull EEG data for a specific duration.
 
+        Samples are written straight into a preallocated buffer (by LSL
+        itself via ``dest_obj`` for float32 streams), so by default the
+        returned arrays are views that the next call will overwrite.
+
         Parameters
         ----------
         duration : float
             Duration in seconds
+        copy : bool
+            Return copies instead of views into the internal buffer
+            (needed when the data outlives the next pull_chunk call)
 
         Returns
         -------
@@ -104,25 +212,36 @@ class EEGAcquisition:
         if self.inlet is None:
             raise RuntimeError("EEG stream not connected. Call connect() first.")
 
-        data_buffer = []
-        ts_buffer = []
+        self._reserve(self._capacity_for(duration) + self._pull_len)
+        write_idx = 0
 
-        start_time = time.time()
+        # Monotonic deadline: immune to wall-clock (NTP) adjustments, and
+        # LSL blocks for exactly the time left instead of overshooting
+        deadline = time.monotonic_ns() + int(duration * 1e9)
 
-        while (time.time() - start_time) < duration:
-            chunk, timestamps = self.inlet.pull_chunk(timeout=0.5)
+        while (remaining_ns := deadline - time.monotonic_ns()) > 0:
+            write_idx += self._pull_into(
+                write_idx, min(self.PULL_TIMEOUT, remaining_ns / 1e9)
+            )
 
-            if timestamps:
-                data_buffer.append(chunk)
-                ts_buffer.append(timestamps)
+        return self._collected(write_idx, copy)
 
-        if not data_buffer:
-            return np.empty((0, 0)), np.empty((0,))
+    def drain(self, copy: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pull everything LSL has buffered, without waiting.
 
-        data = np.vstack(data_buffer)
-        timestamps = np.hstack(ts_buffer)
+        For callers that pace their own reads: draining every T seconds
+        returns the samples of the last T seconds and keeps the LSL
+        buffer near-empty. Same return values as :meth:`pull_chunk`.
+        """
+        if self.inlet is None:
+            raise RuntimeError("EEG stream not connected. Call connect() first.")
 
-        return data, timestamps
+        write_idx = 0
+        while n := self._pull_into(write_idx, 0.0):
+            write_idx += n
+
+        return self._collected(write_idx, copy)
 
     def get_latest_sample(self) -> Tuple[np.ndarray, float]:
         """
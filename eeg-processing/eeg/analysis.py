@@ -11,9 +11,12 @@ EEG Markers untuk Driving:
 - NORMAL:   Balanced ratios → semua ratio mendekati 1.0
 """
 
+import math
 import numpy as np
-from typing import Dict, Any, Optional
-from collections import deque, Counter
+from typing import Dict, Any, Optional, Union
+from collections import deque
+
+from .features import EEGFeatureExtractor
 
 
 class CognitiveAnalyzer:
@@ -53,6 +56,43 @@ class CognitiveAnalyzer:
         }
     }
 
+    # =========================
+    # FEATURE LAYOUT
+    # =========================
+    # Features are handled as fixed-layout float32 vectors: _KEYS are the feature
+    # names (first entries of EEGFeatureExtractor.SUMMARY_KEYS) and
+    # BASELINE_KEYS the matching baseline/metric names, position by position
+    _KEYS = EEGFeatureExtractor.SUMMARY_KEYS[:6]
+    BASELINE_KEYS = (
+        "theta_alpha", "beta_alpha", "alpha_beta",
+        "alpha_power", "beta_power", "theta_power"
+    )
+    # Metric vector indices
+    _TA, _BA, _AB, _ALPHA, _BETA, _THETA = range(6)
+    # Only the ratios are normalized by baseline
+    _RATIOS = slice(_TA, _AB + 1)
+    # =========================
+    # SCORING CONSTANTS
+    # =========================
+    # Indices into _thresh_vec (built from THRESHOLDS in __init__)
+    (_T_FATIGUE_TA_MIN, _T_STRESS_BA_MIN, _T_STRESS_VAR_MIN,
+     _T_FOCUS_BA_MIN, _T_FOCUS_BA_MAX, _T_FOCUS_TA_MAX, _T_FOCUS_STAB_MIN,
+     _T_RELAX_AB_MIN, _T_RELAX_TA_MAX) = range(9)
+    # Per-state score = min(base + excess * slope, cap), for these states
+    _SCORED_STATES = ("fatigue", "stress", "focused", "relaxed")
+    _SCORE_SLOPE = np.array([0.5, 0.3, 0.0, 0.3])
+    _SCORE_CAP = np.array([1.0, 0.8, 1.0, 1.0])
+    # Weight of each state score when discounting "normal"
+    _NORMAL_WEIGHT = np.array([1.0, 0.8, 0.6, 0.6])
+
+    # Calibration completes after this many samples; rows preallocated for them
+    _CALIBRATION_SAMPLES = 5
+    _CALIBRATION_CAPACITY = 8
+
+    # Values for features missing from a per-channel feature dict
+    _CALIBRATION_DEFAULTS = (1.0, 1.0, 1.0, 1.0, 1.0, 1.0)
+    _ANALYSIS_DEFAULTS = (1.0, 1.0, 1.0, 0.0, 0.0, 0.0)
+
     def __init__(self, history_size: int = 5):
         """
         Initialize cognitive analyzer.
@@ -64,42 +104,86 @@ class CognitiveAnalyzer:
         """
         self.history_size = history_size
         
-        # Baseline (established during calibration)
-        self.baseline: Dict[str, float] = {
-            "theta_alpha": 1.0,
-            "beta_alpha": 1.0,
-            "alpha_beta": 1.0,
-            "alpha_power": 1.0,
-            "beta_power": 1.0,
-            "theta_power": 1.0
-        }
+        # Thresholds flattened in _T_* index order for the vectorized scoring
+        t = self.THRESHOLDS
+        self._thresh_vec = np.array([
+            t["fatigue"]["theta_alpha_min"],
+            t["stress"]["beta_alpha_min"],
+            t["stress"]["variability_min"],
+            t["focused"]["beta_alpha_min"],
+            t["focused"]["beta_alpha_max"],
+            t["focused"]["theta_alpha_max"],
+            t["focused"]["stability_min"],
+            t["relaxed"]["alpha_beta_min"],
+            t["relaxed"]["theta_alpha_max"],
+        ])
+        
+        # Baseline (established during calibration); the dict is the public
+        # view, _baseline_vec the same values in BASELINE_KEYS order
+        self.baseline: Dict[str, float] = {key: 1.0 for key in self.BASELINE_KEYS}
+        self._baseline_vec = np.ones(len(self.BASELINE_KEYS), dtype=np.float32)
         self.calibrated = False
         
         # Calibration buffer
-        self._calibration_samples: list = []
+        self._calibration_samples = np.empty(
+            (self._CALIBRATION_CAPACITY, len(self.BASELINE_KEYS)), dtype=np.float32
+        )
+        self._cal_n = 0
         self._calibration_active = False
         
-        # History for temporal smoothing
-        self._ratio_history: Dict[str, deque] = {
-            "theta_alpha": deque(maxlen=history_size),
-            "beta_alpha": deque(maxlen=history_size),
-            "alpha_beta": deque(maxlen=history_size)
-        }
+        # Output buffer of _normalize_by_baseline, reused every window
+        self._norm_out = np.empty(len(self.BASELINE_KEYS), dtype=np.float32)
+        
+        # History for temporal smoothing: ring of the last history_size
+        # ratio vectors (one row per ratio) plus scratch space for the
+        # in-place median selection
+        self._ratio_ring = np.zeros((3, history_size), dtype=np.float32)
+        self._ring_scratch = np.empty_like(self._ratio_ring)
+        self._ring_idx = 0
+        self._ring_count = 0
         self._state_history: deque = deque(maxlen=history_size)
         
         # Stability tracking
-        self._variability_history: deque = deque(maxlen=10)
+        # Ring of the last 10 β/α values with their running sum and sum of
+        # squares, so the std is O(1) per window
+        self._var_ring = [0.0] * 10
+        self._var_idx = 0
+        self._var_count = 0
+        self._var_sum = 0.0
+        self._var_sumsq = 0.0
+
+    def _feature_vector(
+        self,
+        features: Union[np.ndarray, Dict[str, np.ndarray]],
+        defaults: tuple
+    ) -> np.ndarray:
+        """
+        Channel-mean features in _KEYS order.
+
+        The vector from EEGFeatureExtractor.extract_summary is used as-is;
+        a per-channel dict from extract() is averaged key by key, with
+        ``defaults`` for missing features.
+        """
+        if isinstance(features, np.ndarray):
+            return features[:len(self._KEYS)].astype(np.float32, copy=False)
+        return np.array([
+            features[key].mean() if key in features else default
+            for key, default in zip(self._KEYS, defaults)
+        ], dtype=np.float32)
 
     # =========================
     # CALIBRATION
     # =========================
     def start_calibration(self) -> None:
         """Start calibration phase."""
-        self._calibration_samples = []
+        self._cal_n = 0
         self._calibration_active = True
         print("[CALIBRATION] Started - collecting baseline samples...")
 
-    def add_calibration_sample(self, features: Dict[str, np.ndarray]) -> bool:
+    def add_calibration_sample(
+        self,
+        features: Union[np.ndarray, Dict[str, np.ndarray]]
+    ) -> bool:
         """
         Add a sample during calibration.
         
@@ -108,39 +192,58 @@ class CognitiveAnalyzer:
         if not self._calibration_active:
             return False
             
-        if not features:
+        if len(features) == 0:
             return False
         
-        sample = {
-            "theta_alpha": float(np.mean(features.get("theta_alpha", [1.0]))),
-            "beta_alpha": float(np.mean(features.get("beta_alpha", [1.0]))),
-            "alpha_beta": float(np.mean(features.get("alpha_beta", [1.0]))),
-            "alpha_power": float(np.mean(features.get("alpha", [1.0]))),
-            "beta_power": float(np.mean(features.get("beta", [1.0]))),
-            "theta_power": float(np.mean(features.get("theta", [1.0])))
-        }
-        
-        self._calibration_samples.append(sample)
+        self._calibration_samples[self._cal_n] = self._feature_vector(
+            features, self._CALIBRATION_DEFAULTS
+        )
+        self._cal_n += 1
         
         # Need at least 5 samples for stable baseline
-        if len(self._calibration_samples) >= 5:
+        if self._cal_n >= self._CALIBRATION_SAMPLES:
             self._finalize_calibration()
             return True
         
         return False
 
+    def add_calibration_samples(self, features: np.ndarray) -> bool:
+        """
+        Add several calibration samples at once.
+
+        Equivalent to calling :meth:`add_calibration_sample` on each row of
+        ``features`` (summary vectors, one window per row): rows past the
+        one that completes calibration are ignored.
+
+        Returns True when calibration is complete.
+        """
+        if not self._calibration_active or len(features) == 0:
+            return False
+
+        n = min(len(features), self._CALIBRATION_SAMPLES - self._cal_n)
+        self._calibration_samples[self._cal_n:self._cal_n + n] = (
+            features[:n, :len(self._KEYS)]
+        )
+        self._cal_n += n
+
+        if self._cal_n >= self._CALIBRATION_SAMPLES:
+            self._finalize_calibration()
+            return True
+
+        return False
+
     def _finalize_calibration(self) -> None:
         """Compute baseline from calibration samples."""
-        if not self._calibration_samples:
+        if self._cal_n == 0:
             return
         
         # Use median for robustness
-        for key in self.baseline.keys():
-            values = [s.get(key, 1.0) for s in self._calibration_samples]
-            self.baseline[key] = float(np.median(values))
-            # Prevent zero baseline
-            if self.baseline[key] < 0.01:
-                self.baseline[key] = 1.0
+        baseline = np.median(self._calibration_samples[:self._cal_n], axis=0)
+        # Prevent zero baseline
+        baseline[baseline < 0.01] = 1.0
+        
+        self._baseline_vec = baseline
+        self.baseline.update(zip(self.BASELINE_KEYS, baseline.tolist()))
         
         self.calibrated = True
         self._calibration_active = False
@@ -149,44 +252,79 @@ class CognitiveAnalyzer:
     # =========================
     # ANALYSIS HELPERS
     # =========================
-    def _normalize_by_baseline(self, features: Dict[str, np.ndarray]) -> Dict[str, float]:
-        """Normalize features by baseline."""
-        normalized = {}
-        
-        for key in ["theta_alpha", "beta_alpha", "alpha_beta"]:
-            raw_value = float(np.mean(features.get(key, [1.0])))
-            baseline = self.baseline.get(key, 1.0)
-            normalized[key] = raw_value / baseline if baseline > 0 else raw_value
+    def _normalize_by_baseline(
+        self,
+        features: Union[np.ndarray, Dict[str, np.ndarray]]
+    ) -> np.ndarray:
+        """
+        Normalize features by baseline.
         
-        # Also get absolute power values
-        for band in ["alpha", "beta", "theta"]:
-            normalized[f"{band}_power"] = float(np.mean(features.get(band, [0.0])))
+        Returns the metric vector in BASELINE_KEYS order: ratios relative
+        to baseline, band powers as absolute values.
         
-        return normalized
+        The result is written into a buffer owned by the analyzer and is
+        overwritten by the next call; copy it if it must be kept.
+        """
+        metrics = self._norm_out
+        metrics[:] = self._feature_vector(features, self._ANALYSIS_DEFAULTS)
+        baseline = self._baseline_vec[self._RATIOS]
+        np.divide(metrics[self._RATIOS], baseline, out=metrics[self._RATIOS], where=baseline > 0)
+        return metrics
 
-    def _apply_temporal_smoothing(self, metrics: Dict[str, float]) -> Dict[str, float]:
-        """Apply moving median to smooth out noise."""
-        smoothed = {}
-        
-        for key in ["theta_alpha", "beta_alpha", "alpha_beta"]:
-            self._ratio_history[key].append(metrics[key])
-            smoothed[key] = float(np.median(self._ratio_history[key]))
-        
-        # Copy power values without smoothing
-        for key in ["alpha_power", "beta_power", "theta_power"]:
-            smoothed[key] = metrics.get(key, 0.0)
+    def _apply_temporal_smoothing(self, metrics: np.ndarray) -> np.ndarray:
+        """Apply moving median to smooth out the ratios (powers pass through)."""
+        self._ratio_ring[:, self._ring_idx] = metrics[self._RATIOS]
+        self._ring_idx = (self._ring_idx + 1) % self.history_size
+        self._ring_count = min(self._ring_count + 1, self.history_size)
+        
+        # Median by selection (np.partition) instead of a full sort; slots
+        # [0, count) are the filled ones, their order doesn't matter
+        n = self._ring_count
+        mid = n // 2
+        window = self._ring_scratch[:, :n]
+        window[:] = self._ratio_ring[:, :n]
+        
+        smoothed = metrics.copy()
+        if n % 2:
+            window.partition(mid, axis=1)
+            smoothed[self._RATIOS] = window[:, mid]
+        else:
+            window.partition((mid - 1, mid), axis=1)
+            smoothed[self._RATIOS] = (window[:, mid - 1] + window[:, mid]) / 2
         
         return smoothed
 
-    def _compute_variability(self, metrics: Dict[str, float]) -> float:
+    def _compute_variability(self, metrics: np.ndarray) -> float:
         """Compute signal variability (indicator of stress)."""
-        beta_alpha = metrics.get("beta_alpha", 1.0)
-        self._variability_history.append(beta_alpha)
-        
-        if len(self._variability_history) < 3:
+        beta_alpha = float(metrics[self._BA])
+        ring = self._var_ring
+        size = len(ring)
+        
+        # Evict the oldest value once the window is full
+        if self._var_count == size:
+            old = ring[self._var_idx]
+            self._var_sum -= old
+            self._var_sumsq -= old * old
+        else:
+            self._var_count += 1
+        
+        ring[self._var_idx] = beta_alpha
+        self._var_sum += beta_alpha
+        self._var_sumsq += beta_alpha * beta_alpha
+        self._var_idx = (self._var_idx + 1) % size
+        
+        # Re-anchor the running sums once per lap so rounding errors from
+        # the add/subtract updates cannot accumulate over a long session
+        if self._var_idx == 0:
+            self._var_sum = math.fsum(ring)
+            self._var_sumsq = math.fsum(v * v for v in ring)
+        
+        n = self._var_count
+        if n < 3:
             return 0.0
         
-        return float(np.std(self._variability_history))
+        mean = self._var_sum / n
+        return math.sqrt(max(0.0, self._var_sumsq / n - mean * mean))
 
     def _compute_stability(self) -> float:
         """Compute signal stability (1.0 = very stable, 0.0 = unstable)."""
@@ -204,7 +342,7 @@ class CognitiveAnalyzer:
 
     def _compute_state_scores(
         self, 
-        metrics: Dict[str, float],
+        metrics: np.ndarray,
         variability: float,
         stability: float
     ) -> Dict[str, float]:
@@ -213,74 +351,53 @@ class CognitiveAnalyzer:
         
         Returns dict with scores 0.0-1.0 for each state.
         """
-        theta_alpha = metrics["theta_alpha"]
-        beta_alpha = metrics["beta_alpha"]
-        alpha_beta = metrics["alpha_beta"]
-        
-        scores = {}
-        
-        # ----- FATIGUE -----
-        # High theta relative to alpha = drowsy
-        fatigue_score = 0.0
-        if theta_alpha > self.THRESHOLDS["fatigue"]["theta_alpha_min"]:
-            # Score increases as theta_alpha increases beyond threshold
-            excess = theta_alpha - self.THRESHOLDS["fatigue"]["theta_alpha_min"]
-            fatigue_score = min(0.5 + excess * 0.5, 1.0)
-        scores["fatigue"] = fatigue_score
-        
-        # ----- STRESS -----
-        # Very high beta + high variability = stress
-        stress_score = 0.0
-        stress_thresh = self.THRESHOLDS["stress"]
-        if beta_alpha > stress_thresh["beta_alpha_min"]:
-            # Base score from high beta
-            excess = beta_alpha - stress_thresh["beta_alpha_min"]
-            stress_score = min(0.4 + excess * 0.3, 0.8)
-            # Boost if high variability (erratic = stress)
-            if variability > stress_thresh["variability_min"]:
-                stress_score = min(stress_score + 0.2, 1.0)
-        scores["stress"] = stress_score
-        
-        # ----- FOCUSED -----
-        # Moderate-high beta, stable signal, not drowsy
-        focused_score = 0.0
-        focus_thresh = self.THRESHOLDS["focused"]
-        if (focus_thresh["beta_alpha_min"] <= beta_alpha <= focus_thresh["beta_alpha_max"]
-            and theta_alpha < focus_thresh["theta_alpha_max"]):
-            # Base score from beta in right range
-            focused_score = 0.5
-            # Boost if stable
-            if stability > focus_thresh["stability_min"]:
-                focused_score += 0.3
-            # Boost if low variability (calm focus)
-            if variability < 0.1:
-                focused_score += 0.2
-        scores["focused"] = min(focused_score, 1.0)
-        
-        # ----- RELAXED -----
-        # High alpha relative to beta = relaxed but alert
-        relaxed_score = 0.0
-        relax_thresh = self.THRESHOLDS["relaxed"]
-        if (alpha_beta > relax_thresh["alpha_beta_min"] 
-            and theta_alpha < relax_thresh["theta_alpha_max"]):
-            excess = alpha_beta - relax_thresh["alpha_beta_min"]
-            relaxed_score = min(0.5 + excess * 0.3, 1.0)
-        scores["relaxed"] = relaxed_score
+        ratios = metrics[self._RATIOS]
+        theta_alpha, beta_alpha, alpha_beta = ratios
+        t = self._thresh_vec
+        
+        # Scored states, in order: fatigue, stress, focused, relaxed
+        # - FATIGUE: high theta relative to alpha = drowsy
+        # - STRESS:  very high beta (+ boost if erratic / high variability)
+        # - FOCUSED: moderate-high beta, not drowsy (+ boosts if stable, calm)
+        # - RELAXED: high alpha relative to beta, not drowsy
+        gate = np.array([
+            theta_alpha > t[self._T_FATIGUE_TA_MIN],
+            beta_alpha > t[self._T_STRESS_BA_MIN],
+            (t[self._T_FOCUS_BA_MIN] <= beta_alpha <= t[self._T_FOCUS_BA_MAX]
+             and theta_alpha < t[self._T_FOCUS_TA_MAX]),
+            (alpha_beta > t[self._T_RELAX_AB_MIN]
+             and theta_alpha < t[self._T_RELAX_TA_MAX]),
+        ])
+        # How far each state's driving ratio is beyond its threshold
+        excess = np.array([
+            theta_alpha - t[self._T_FATIGUE_TA_MIN],
+            beta_alpha - t[self._T_STRESS_BA_MIN],
+            0.0,
+            alpha_beta - t[self._T_RELAX_AB_MIN],
+        ])
+        focused_base = (0.5
+                        + 0.3 * (stability > t[self._T_FOCUS_STAB_MIN])
+                        + 0.2 * (variability < 0.1))
+        base = np.array([0.5, 0.4, focused_base, 0.5])
+        boost = np.array([0.0, 0.2 * (variability > t[self._T_STRESS_VAR_MIN]), 0.0, 0.0])
+        
+        state_scores = np.minimum(base + excess * self._SCORE_SLOPE, self._SCORE_CAP)
+        state_scores = np.minimum(state_scores + boost, 1.0)
+        state_scores = np.where(gate, state_scores, 0.0)
         
         # ----- NORMAL -----
         # Balanced state - all ratios close to 1.0
         # Normal score is high when OTHER scores are low
-        normal_score = 1.0 - max(fatigue_score, stress_score * 0.8, 
-                                  focused_score * 0.6, relaxed_score * 0.6)
+        normal_score = 1.0 - (state_scores * self._NORMAL_WEIGHT).max()
         
         # Also check if ratios are balanced (close to 1.0)
-        balance_score = 1.0
-        for ratio in [theta_alpha, beta_alpha, alpha_beta]:
-            deviation = abs(ratio - 1.0)
-            balance_score -= deviation * 0.2
+        deviation = np.abs(ratios - 1.0) * 0.2
+        balance_score = 1.0 - deviation[0] - deviation[1] - deviation[2]
         
         normal_score = max(0.0, min(normal_score, balance_score))
-        scores["normal"] = normal_score
+        
+        scores = dict(zip(self._SCORED_STATES, state_scores.tolist()))
+        scores["normal"] = float(normal_score)
         
         return scores
 
@@ -310,14 +427,15 @@ class CognitiveAnalyzer:
         # Apply majority voting for stability
         self._state_history.append(best_state)
         
-        if len(self._state_history) >= 3:
-            # Count recent states
-            recent = list(self._state_history)[-3:]
-            counts = Counter(recent)
-            voted_state, count = counts.most_common(1)[0]
-            # Only override if majority agrees
-            if count >= 2:
-                best_state = voted_state
+        history = self._state_history
+        if len(history) >= 3:
+            # Majority of the last three states; only override if at
+            # least two agree (deque indexing at the ends is O(1))
+            a, b, c = history[-3], history[-2], history[-1]
+            if a == b or a == c:
+                best_state = a
+            elif b == c:
+                best_state = b
         
         return best_state, confidence
 
@@ -326,7 +444,7 @@ class CognitiveAnalyzer:
     # =========================
     def analyze(
         self,
-        features: Dict[str, np.ndarray],
+        features: Union[np.ndarray, Dict[str, np.ndarray]],
         signal_quality: float = 1.0
     ) -> Dict[str, Any]:
         """
@@ -334,8 +452,10 @@ class CognitiveAnalyzer:
         
         Parameters
         ----------
-        features : dict
-            Extracted EEG features from FeatureExtractor
+        features : np.ndarray or dict
+            Extracted EEG features from FeatureExtractor; both forms are
+            accepted: the float32 channel-mean vector from extract_summary()
+            or the per-channel dict from extract()
         signal_quality : float
             Signal quality score (0-1) from preprocessor
             
@@ -345,7 +465,7 @@ class CognitiveAnalyzer:
             Analysis result with state, confidence, metrics
         """
         # Handle empty/bad data
-        if not features or signal_quality < 0.2:
+        if len(features) == 0 or signal_quality < 0.2:
             return {
                 "state": "unknown",
                 "confidence": 0.0,
@@ -377,9 +497,9 @@ class CognitiveAnalyzer:
             "state": state,
             "confidence": round(confidence, 2),
             "metrics": {
-                "theta_alpha": round(metrics["theta_alpha"], 3),
-                "beta_alpha": round(metrics["beta_alpha"], 3),
-                "alpha_beta": round(metrics["alpha_beta"], 3)
+                "theta_alpha": round(float(metrics[self._TA]), 3),
+                "beta_alpha": round(float(metrics[self._BA]), 3),
+                "alpha_beta": round(float(metrics[self._AB]), 3)
             },
             "scores": {k: round(v, 2) for k, v in scores.items()},
             "quality": round(signal_quality, 2),
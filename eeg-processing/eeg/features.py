@@ -9,7 +9,9 @@ for cognitive state analysis (fatigue, stress, focus).
 """
 
 import numpy as np
-from scipy.signal import welch
+from numpy.lib.stride_tricks import as_strided
+from scipy.fft import rfft
+from scipy.signal import get_window, welch
 from typing import Dict, Tuple
 
 
@@ -18,6 +20,12 @@ class EEGFeatureExtractor:
     EEG feature extraction using spectral analysis.
     """
 
+    # Layout of the vector returned by extract_summary()
+    SUMMARY_KEYS = (
+        "theta_alpha", "beta_alpha", "alpha_beta",
+        "alpha", "beta", "theta", "delta", "gamma"
+    )
+
     def __init__(
         self,
         sampling_rate: float,
@@ -45,21 +53,95 @@ class EEGFeatureExtractor:
             "gamma": (30, 45)
         }
 
+        # Band index ranges into the Welch frequency grid, keyed by the
+        # grid itself (bin count, bin spacing): welch shortens nperseg for
+        # short input, and lengths n and n+1 (n even) share a bin count
+        self._band_slices: Dict[Tuple[int, float], Dict[str, slice]] = {}
+        self._freqs = np.fft.rfftfreq(nperseg, 1 / sampling_rate)
+        self._get_band_slices(self._freqs)
+
+        # Fixed-shape Welch setup (same parameters as scipy.signal.welch
+        # defaults): periodic Hann window, 50% overlap, density scaling
+        # with the one-sided spectrum doubled except at DC/Nyquist
+        self._win = get_window("hann", nperseg).astype(np.float32)
+        self._step = nperseg - nperseg // 2
+        self._psd_scale = np.full(len(self._freqs), 2.0 / (sampling_rate * np.sum(self._win ** 2)))
+        self._psd_scale[0] /= 2
+        if nperseg % 2 == 0:
+            self._psd_scale[-1] /= 2
+
+        # (segments, channels, nperseg) work buffer for the rFFT input,
+        # reallocated only when the window shape changes
+        self._seg_buf = np.empty((0, 0, nperseg), dtype=np.float32)
+
     # =========================
     # CORE METHODS
     # =========================
+    def _get_band_slices(self, freqs: np.ndarray) -> Dict[str, slice]:
+        """
+        Slices selecting each band's bins (low <= f <= high) in ``freqs``.
+        Computed once per frequency grid and cached.
+        """
+        key = (len(freqs), float(freqs[1] - freqs[0]))
+        slices = self._band_slices.get(key)
+        if slices is None:
+            slices = {
+                band: slice(
+                    np.searchsorted(freqs, low, side="left"),
+                    np.searchsorted(freqs, high, side="right")
+                )
+                for band, (low, high) in self.bands.items()
+            }
+            self._band_slices[key] = slices
+        return slices
+
     def _band_power(
         self,
-        freqs: np.ndarray,
         psd: np.ndarray,
-        band: Tuple[float, float]
-    ) -> float:
+        band_slice: slice,
+        df: float
+    ) -> np.ndarray:
         """
         Compute band power using PSD integration.
+
+        Welch frequencies are uniformly spaced, so the band is integrated
+        with a constant step ``df`` instead of its frequency subarray.
+        ``psd`` is (freqs, channels); one power per channel is returned.
         """
-        low, high = band
-        idx = np.logical_and(freqs >= low, freqs <= high)
-        return np.trapz(psd[idx], freqs[idx])
+        return np.trapz(psd[band_slice], dx=df, axis=0)
+
+    def _welch_fast(self, data: np.ndarray) -> np.ndarray:
+        """
+        Welch PSD specialised for the fixed ``nperseg``.
+
+        Matches ``welch(data, fs, nperseg=self.nperseg, axis=0)`` (constant
+        detrend, mean over segments) using the precomputed window and
+        scaling; all segments and channels go through one batched rFFT.
+        ``data`` needs at least ``nperseg`` samples. Returns (freqs, channels).
+        """
+        # Channel-major copy, so every segment is a contiguous run of
+        # samples; the (segments, channels, nperseg) view over it is free
+        series = np.ascontiguousarray(data.T, dtype=np.result_type(data.dtype, np.float32))
+        n_channels, n_samples = series.shape
+        n_segments = (n_samples - self.nperseg) // self._step + 1
+        item = series.strides[1]
+        view = as_strided(
+            series,
+            shape=(n_segments, n_channels, self.nperseg),
+            strides=(self._step * item, series.strides[0], item),
+            writeable=False
+        )
+
+        # Detrend + window into the reusable work buffer
+        if self._seg_buf.shape != view.shape or self._seg_buf.dtype != series.dtype:
+            self._seg_buf = np.empty(view.shape, dtype=series.dtype)
+        segments = self._seg_buf
+        np.subtract(view, view.mean(axis=-1, keepdims=True), out=segments)
+        segments *= self._win
+
+        spectrum = rfft(segments, axis=-1, overwrite_x=True)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        return power.mean(axis=0).T * self._psd_scale[:, None]
 
     def compute_band_powers(self, data: np.ndarray) -> Dict[str, np.ndarray]:
         """
@@ -75,24 +157,26 @@ class EEGFeatureExtractor:
         Dict[str, np.ndarray]
             Band powers per channel
         """
-        band_powers = {band: [] for band in self.bands}
-
-        for ch in range(data.shape[1]):
+        # One Welch pass for all channels: psd is (freqs, channels).
+        # Input shorter than nperseg falls back to scipy, which shortens
+        # the segment to the available samples.
+        if data.shape[0] >= self.nperseg:
+            freqs, psd = self._freqs, self._welch_fast(data)
+        else:
             freqs, psd = welch(
-                data[:, ch],
+                data,
                 fs=self.fs,
-                nperseg=self.nperseg
+                nperseg=self.nperseg,
+                axis=0
             )
 
-            for band, freq_range in self.bands.items():
-                power = self._band_power(freqs, psd, freq_range)
-                band_powers[band].append(power)
+        band_slices = self._get_band_slices(freqs)
+        df = freqs[1] - freqs[0]
 
-        # Convert to numpy arrays
-        for band in band_powers:
-            band_powers[band] = np.array(band_powers[band])
-
-        return band_powers
+        return {
+            band: self._band_power(psd, band_slice, df)
+            for band, band_slice in band_slices.items()
+        }
 
     # =========================
     # RATIO FEATURES
@@ -148,3 +232,33 @@ class EEGFeatureExtractor:
         }
 
         return features
+
+    def extract_summary(self, data: np.ndarray) -> np.ndarray:
+        """
+        Feature extraction reduced to channel means.
+
+        Same features as :meth:`extract`, averaged over channels and packed
+        into a fixed-layout vector ordered as ``SUMMARY_KEYS``. Use this
+        when only channel-averaged values are consumed (CognitiveAnalyzer,
+        backend payload).
+
+        Parameters
+        ----------
+        data : np.ndarray
+            Clean EEG data (samples, channels)
+
+        Returns
+        -------
+        np.ndarray
+            Channel-mean ratios and band powers, (len(SUMMARY_KEYS),)
+            float32
+        """
+        if data.size == 0:
+            return np.empty(0, dtype=np.float32)
+
+        band_powers = self.compute_band_powers(data)
+        features = {**band_powers, **self.compute_ratios(band_powers)}
+
+        return np.array(
+            [features[key].mean() for key in self.SUMMARY_KEYS], dtype=np.float32
+        )
@@ -0,0 +1,30 @@
+"""
+jit.py
+======
+Optional Numba support for the numeric kernels.
+
+Numba is an optional dependency. When it is installed, ``njit`` and
+``prange`` are Numba's own; otherwise ``njit`` leaves the function
+unchanged and ``prange`` is ``range``, so the same kernels run as plain
+Python/NumPy.
+"""
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for ``numba.njit`` (bare or with options)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
+
+
+__all__ = ["njit", "prange", "NUMBA_AVAILABLE"]
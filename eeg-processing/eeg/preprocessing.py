@@ -16,9 +16,92 @@ Key Design Choices for Driving:
 """
 
 import numpy as np
-from scipy.signal import butter, filtfilt, iirnotch, medfilt
-from scipy.ndimage import uniform_filter1d
-from typing import Optional, Tuple, Dict
+from scipy.signal import butter, iirnotch, sosfiltfilt, tf2sos
+from scipy.ndimage import median_filter, uniform_filter1d
+from typing import Optional, Tuple, Dict, Union
+
+from .jit import NUMBA_AVAILABLE, njit, prange
+
+
+# =========================
+# NUMBA KERNELS
+# =========================
+# Channel-parallel versions of the per-channel statistics used below.
+# Only called when Numba is installed; the NumPy paths are used otherwise.
+@njit(parallel=True, cache=True, fastmath=True)
+def _attenuate_artifacts_numba(data, threshold_factor):
+    """In-place soft clipping of each channel beyond threshold_factor * MAD."""
+    n_samples, n_channels = data.shape
+    for ch in prange(n_channels):
+        channel = data[:, ch]
+        median = np.median(channel)
+        mad = np.median(np.abs(channel - median))
+        if mad == 0:
+            continue
+
+        threshold = threshold_factor * mad * 1.4826
+        upper = median + threshold
+        lower = median - threshold
+        for i in range(n_samples):
+            value = channel[i]
+            if value > upper:
+                channel[i] = upper + np.tanh((value - upper) / threshold) * threshold * 0.5
+            elif value < lower:
+                channel[i] = lower - np.tanh((lower - value) / threshold) * threshold * 0.5
+    return data
+
+
+@njit(parallel=True, cache=True)
+def _signal_quality_numba(data):
+    """All three signal-quality checks in one pass over the channels."""
+    n_samples, n_channels = data.shape
+    std = np.empty(n_channels)
+    abs_diff_sum = np.empty(n_channels)
+    artifact_ratio = np.zeros(n_channels)
+
+    for ch in prange(n_channels):
+        channel = data[:, ch].astype(np.float64)
+        std[ch] = np.std(channel)
+
+        total = 0.0
+        for i in range(1, n_samples):
+            total += abs(channel[i] - channel[i - 1])
+        abs_diff_sum[ch] = total
+
+        median = np.median(channel)
+        deviation = np.abs(channel - median)
+        mad = np.median(deviation)
+        if mad > 0:
+            limit = 4 * mad * 1.4826
+            outliers = 0
+            for i in range(n_samples):
+                if deviation[i] > limit:
+                    outliers += 1
+            artifact_ratio[ch] = outliers / n_samples
+
+    quality = 1.0
+
+    # Check 1: Flat line detection (loose electrode)
+    flat = 0
+    for ch in range(n_channels):
+        if std[ch] < 0.1:
+            flat += 1
+    quality -= flat / n_channels * 0.3
+
+    # Check 2: Excessive high-frequency noise
+    if n_samples > 1:
+        noise_level = abs_diff_sum.sum() / ((n_samples - 1) * n_channels)
+    else:
+        noise_level = np.nan
+    expected_noise = np.median(std) * 0.5
+    if expected_noise > 0:
+        noise_ratio = min(noise_level / expected_noise, 2.0) - 1.0
+        quality -= max(0.0, noise_ratio) * 0.2
+
+    # Check 3: Artifact proportion
+    quality -= artifact_ratio.sum() * 0.1
+
+    return max(0.0, min(1.0, quality))
 
 
 class EEGPreprocessor:
@@ -69,32 +152,41 @@ class EEGPreprocessor:
         self._baseline_buffer: list = []
         self._baseline_window = 30  # 30 windows (~60 seconds)
 
-        self._bandpass_b, self._bandpass_a = self._design_bandpass()
-        self._notch_b, self._notch_a = self._design_notch()
+        # Filters as second-order sections; the bandpass and notch are also
+        # cascaded so process() filters in a single forward-backward pass
+        self._bandpass_sos = self._design_bandpass()
+        self._notch_sos = self._design_notch()
+        if self._notch_sos is None:
+            self._sos = self._bandpass_sos
+        else:
+            self._sos = np.vstack([self._bandpass_sos, self._notch_sos])
+        # Edge padding filtfilt used for the (b, a) bandpass; the 1 Hz
+        # high-pass transient makes the output sensitive to this
+        self._padlen = 3 * (2 * filter_order + 1)
 
     # =========================
     # FILTER DESIGN
     # =========================
-    def _design_bandpass(self) -> Tuple[np.ndarray, np.ndarray]:
+    def _design_bandpass(self) -> np.ndarray:
         nyq = 0.5 * self.fs
         low = self.lowcut / nyq
         high = self.highcut / nyq
 
-        b, a = butter(
+        return butter(
             self.filter_order,
             [low, high],
-            btype="bandpass"
+            btype="bandpass",
+            output="sos"
         )
-        return b, a
 
-    def _design_notch(self) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    def _design_notch(self) -> Optional[np.ndarray]:
         if self.notch_freq is None:
-            return None, None
+            return None
 
         nyq = 0.5 * self.fs
         freq = self.notch_freq / nyq
         b, a = iirnotch(freq, Q=30)
-        return b, a
+        return tf2sos(b, a)
 
     # =========================
     # PREPROCESSING STEPS
@@ -113,16 +205,28 @@ class EEGPreprocessor:
         np.ndarray
             Filtered EEG data
         """
-        return filtfilt(self._bandpass_b, self._bandpass_a, data, axis=0)
+        return sosfiltfilt(self._bandpass_sos, data, axis=0, padlen=self._padlen)
 
     def notch_filter(self, data: np.ndarray) -> np.ndarray:
         """
         Apply notch filter to remove powerline noise.
         """
-        if self._notch_b is None:
+        if self._notch_sos is None:
             return data
 
-        return filtfilt(self._notch_b, self._notch_a, data, axis=0)
+        return sosfiltfilt(self._notch_sos, data, axis=0)
+
+    def filtfilt_combined(self, data: np.ndarray) -> np.ndarray:
+        """
+        Apply bandpass and notch filters in one zero-phase pass.
+
+        Equivalent to bandpass_filter followed by notch_filter, but the
+        data is traversed once by the cascaded second-order sections.
+        Coefficients and filter state stay float64; the result keeps the
+        floating-point precision of the input (float32 stays float32).
+        """
+        filtered = sosfiltfilt(self._sos, data, axis=0, padlen=self._padlen)
+        return filtered.astype(np.result_type(data.dtype, np.float32), copy=False)
 
     def baseline_correction(self, data: np.ndarray) -> np.ndarray:
         """
@@ -143,22 +247,49 @@ class EEGPreprocessor:
     # =========================
     # DRIVING-OPTIMIZED METHODS
     # =========================
-    def robust_baseline_correction(self, data: np.ndarray) -> np.ndarray:
+    @staticmethod
+    def robust_stats(data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-channel median and MAD (Median Absolute Deviation).
+
+        robust_baseline_correction and robust_normalize accept these as
+        ``median=`` / ``mad=`` so a caller holding them for the same data
+        can skip recomputing.
+        """
+        median = np.median(data, axis=0)
+        mad = np.median(np.abs(data - median), axis=0)
+        return median, mad
+
+    def robust_baseline_correction(
+        self,
+        data: np.ndarray,
+        median: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         """
         Remove DC offset using MEDIAN (more robust to artifacts).
         Better than mean for driving conditions with motion artifacts.
         """
-        baseline = np.median(data, axis=0)
+        baseline = np.median(data, axis=0) if median is None else median
         return data - baseline
 
-    def robust_normalize(self, data: np.ndarray) -> np.ndarray:
+    def robust_normalize(
+        self,
+        data: np.ndarray,
+        median: Optional[Union[np.ndarray, float]] = None,
+        mad: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         """
         Robust normalization using median and MAD (Median Absolute Deviation).
         More resistant to outliers from motion artifacts.
+
+        ``median`` may be a per-channel array or a scalar applied to every
+        channel (e.g. 0.0 for data already median-centred).
         """
-        median = np.median(data, axis=0)
-        mad = np.median(np.abs(data - median), axis=0)
-        mad[mad == 0] = 1.0  # prevent division by zero
+        if median is None:
+            median = np.median(data, axis=0)
+        if mad is None:
+            mad = np.median(np.abs(data - median), axis=0)
+        mad = np.where(mad == 0, 1.0, mad)  # prevent division by zero
         # Scale MAD to approximate std (for normal distribution)
         return (data - median) / (mad * 1.4826)
 
@@ -182,31 +313,27 @@ class EEGPreprocessor:
         np.ndarray
             Data with attenuated artifacts
         """
-        for ch in range(data.shape[1]):
-            channel = data[:, ch]
-            median = np.median(channel)
-            mad = np.median(np.abs(channel - median))
-            
-            if mad == 0:
-                continue
-                
-            threshold = threshold_factor * mad * 1.4826
-            
-            # Soft clipping: compress values beyond threshold
-            upper = median + threshold
-            lower = median - threshold
-            
-            # Apply soft sigmoid-like compression
-            above_mask = channel > upper
-            below_mask = channel < lower
-            
-            if np.any(above_mask):
-                excess = channel[above_mask] - upper
-                data[above_mask, ch] = upper + np.tanh(excess / threshold) * threshold * 0.5
-                
-            if np.any(below_mask):
-                excess = lower - channel[below_mask]
-                data[below_mask, ch] = lower - np.tanh(excess / threshold) * threshold * 0.5
+        if NUMBA_AVAILABLE:
+            return _attenuate_artifacts_numba(data, threshold_factor)
+        
+        # Per-channel robust center and spread, broadcast against (samples, channels)
+        median = np.median(data, axis=0)
+        mad = np.median(np.abs(data - median), axis=0)
+        
+        # Channels with zero MAD are passed through untouched
+        active = mad != 0
+        threshold = threshold_factor * np.where(active, mad, 1.0) * 1.4826
+        
+        # Soft clipping: compress values beyond threshold
+        upper = median + threshold
+        lower = median - threshold
+        
+        # Apply soft sigmoid-like compression
+        above = np.tanh((data - upper) / threshold) * threshold * 0.5
+        np.copyto(data, upper + above, where=(data > upper) & active)
+        
+        below = np.tanh((lower - data) / threshold) * threshold * 0.5
+        np.copyto(data, lower - below, where=(data < lower) & active)
         
         return data
 
@@ -230,11 +357,8 @@ class EEGPreprocessor:
         if window_size % 2 == 0:
             window_size += 1
             
-        smoothed = np.zeros_like(data)
-        for ch in range(data.shape[1]):
-            smoothed[:, ch] = medfilt(data[:, ch], kernel_size=window_size)
-        
-        return smoothed
+        # Window along time only; zero padding at the edges as medfilt did
+        return median_filter(data, size=(window_size, 1), mode="constant", cval=0.0)
 
     def compute_signal_quality(self, data: np.ndarray) -> float:
         """
@@ -253,6 +377,9 @@ class EEGPreprocessor:
         """
         if data.size == 0:
             return 0.0
+        
+        if NUMBA_AVAILABLE:
+            return _signal_quality_numba(data)
             
         quality = 1.0
         
@@ -270,13 +397,12 @@ class EEGPreprocessor:
             quality -= max(0, noise_ratio) * 0.2
         
         # Check 3: Artifact proportion
-        for ch in range(data.shape[1]):
-            median = np.median(data[:, ch])
-            mad = np.median(np.abs(data[:, ch] - median))
-            if mad > 0:
-                outliers = np.abs(data[:, ch] - median) > 4 * mad * 1.4826
-                artifact_ratio = np.sum(outliers) / len(outliers)
-                quality -= artifact_ratio * 0.1
+        median = np.median(data, axis=0)
+        deviation = np.abs(data - median)
+        mad = np.median(deviation, axis=0)
+        outliers = deviation > 4 * mad * 1.4826
+        artifact_ratio = np.mean(outliers, axis=0)
+        quality -= np.sum(artifact_ratio[mad > 0]) * 0.1
         
         return max(0.0, min(1.0, quality))
 
@@ -303,18 +429,21 @@ class EEGPreprocessor:
         - Uses artifact ATTENUATION (not rejection)
         - Uses robust statistics (median-based)
         - Always returns data (never rejects for safety)
+        
+        The pipeline runs in float32 (EEG sample resolution is well below
+        its precision); the returned data is float32.
         """
         if data.size == 0:
             return data, 0.0
 
+        data = np.ascontiguousarray(data, dtype=np.float32)
+
         # Compute quality BEFORE processing (on raw data)
         quality = self.compute_signal_quality(data)
 
-        # Step 1: Bandpass filter (removes drift and high-freq noise)
-        data = self.bandpass_filter(data)
-        
-        # Step 2: Notch filter (removes power line interference)
-        data = self.notch_filter(data)
+        # Step 1+2: Bandpass (removes drift and high-freq noise) and notch
+        # (removes power line interference) as one SOS cascade
+        data = self.filtfilt_combined(data)
         
         if self.driving_mode:
             # Driving-optimized pipeline
@@ -326,10 +455,12 @@ class EEGPreprocessor:
             data = self.smooth_temporal(data, window_size=3)
             
             # Step 5: Robust baseline correction (median-based)
-            data = self.robust_baseline_correction(data)
+            median, mad = self.robust_stats(data)
+            data = self.robust_baseline_correction(data, median=median)
             
-            # Step 6: Robust normalization (MAD-based)
-            data = self.robust_normalize(data)
+            # Step 6: Robust normalization (MAD-based); the data is now
+            # median-centred with an unchanged MAD, so reuse it
+            data = self.robust_normalize(data, median=0.0, mad=mad)
         else:
             # Standard lab-based pipeline
             data = self.baseline_correction(data)
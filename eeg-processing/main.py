@@ -60,7 +60,7 @@ def main():
         if raw_data.size > 0:
             clean_data, quality = preprocessor.process(raw_data)
             if clean_data.size > 0 and quality > 0.3:
-                features = extractor.extract(clean_data)
+                features = extractor.extract_summary(clean_data)
                 calibration_complete = analyzer.add_calibration_sample(features)
     
     if calibration_complete:
@@ -94,7 +94,7 @@ def main():
                 continue
 
             # 3️⃣ Feature extraction
-            features = extractor.extract(clean_data)
+            features = extractor.extract_summary(clean_data)
 
             # 4️⃣ Cognitive analysis (with quality weighting)
             result = analyzer.analyze(features, signal_quality=quality)
@@ -20,16 +20,20 @@ Usage:
 import time
 import argparse
 import logging
+import queue
+import threading
+import orjson
 import requests
-from datetime import datetime
-from typing import Optional
+from requests.adapters import HTTPAdapter
+from typing import List, Optional
 import numpy as np
 
 from eeg import EEGAcquisition, EEGPreprocessor, EEGFeatureExtractor, CognitiveAnalyzer
+from eeg.jit import njit
 from config import (
-    SAMPLING_RATE, CHUNK_DURATION, 
+    SAMPLING_RATE, CHUNK_DURATION, CHANNEL_LABELS, LSL_MAX_BUFLEN,
     LOWCUT_FREQ, HIGHCUT_FREQ, NOTCH_FREQ,
-    BACKEND_URL, EEG_ENDPOINT
+    BACKEND_URL, EEG_ENDPOINT, EEG_BATCH_ENDPOINT, SEND_BATCH_SIZE
 )
 
 
@@ -43,32 +47,74 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# requests exception classes checked on every failed send
+_ConnectionError = requests.exceptions.ConnectionError
+_Timeout = requests.exceptions.Timeout
+
+# EEG channels reported in the payload's "channels" (backend schema)
+CH_NAMES = tuple(CHANNEL_LABELS[:4])
+
+# Positions of the payload's band powers in extract_summary() vectors
+_PAYLOAD_BANDS = [
+    EEGFeatureExtractor.SUMMARY_KEYS.index(band)
+    for band in ("theta", "alpha", "beta", "gamma")
+]
+
 
 # ===========================
-# STATE MAPPING (EEG -> Backend)
+# FATIGUE SCORING (per tick)
 # ===========================
+# State codes understood by _score (anything else is 0)
+_STATE_FATIGUE = 1
+_STATE_CODES = {"fatigue": _STATE_FATIGUE}
+
+# cognitive_state sent to the backend, indexed by _score's state code.
 # Backend schema expects: "alert", "drowsy", "fatigued"
 # See: backend/app/schemas/eeg.py EEGDataPoint.cognitive_state
+_COGNITIVE_STATES = ("alert", "drowsy", "fatigued")
+
 
-def get_backend_state(internal_state: str, fatigue_score: float) -> str:
+@njit(cache=True)
+def _score(theta_alpha, state_code, confidence):
     """
-    Convert internal cognitive state ke format yang backend harapkan.
-    
-    Backend expects: "alert", "drowsy", "fatigued"
-    Internal states: "fatigue", "stress", "focused", "relaxed", "normal", "unknown"
+    Fatigue score (0-100 scale for backend) and _COGNITIVE_STATES index.
     """
-    # Fatigue score based mapping (primary)
-    if fatigue_score >= 70:
-        return "fatigued"
-    elif fatigue_score >= 40:
-        return "drowsy"
+    fatigue_score = min(100.0, max(0.0, (theta_alpha - 1.0) * 50 + 30))
     
-    # State based mapping (secondary)
-    if internal_state == "fatigue":
-        return "drowsy"
+    # Adjust based on detected state
+    if state_code == _STATE_FATIGUE:
+        fatigue_score = max(fatigue_score, 50 + confidence * 45)
     
-    # All other states map to alert
-    return "alert"
+    # Determine cognitive state based on fatigue
+    if fatigue_score < 30:
+        return fatigue_score, 0
+    if fatigue_score < 60:
+        return fatigue_score, 1
+    return fatigue_score, 2
+
+
+# ===========================
+# TIMESTAMPS
+# ===========================
+# Last formatted wall-clock second, reused until the second changes
+_ts_sec = -1
+_ts_prefix = ""
+
+
+def _iso_timestamp() -> str:
+    """
+    Current local time as ISO 8601 with milliseconds plus "Z"
+    (same clock as the former datetime.now().isoformat() + "Z").
+    """
+    global _ts_sec, _ts_prefix
+    now = time.time()
+    sec = int(now)
+    if sec != _ts_sec:
+        _ts_sec = sec
+        _ts_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(sec))
+    return f"{_ts_prefix}.{int((now - sec) * 1000):03d}Z"
 
 
 # ===========================
@@ -81,11 +127,23 @@ class EEGStreamingServer:
     Backend akan menerima data dan broadcast ke frontend via WebSocket.
     """
     
+    # Payloads waiting for the sender thread; when full the oldest is
+    # dropped (stale EEG data is worthless to the backend)
+    SEND_QUEUE_SIZE = 8
+    
+    # Seconds to wait for queued payloads to go out on shutdown
+    SENDER_JOIN_TIMEOUT = 5.0
+    
+    # Raw windows where every channel's variance is below this are flat
+    # lines (headset off / electrodes lost) and are skipped
+    FLAT_VARIANCE = 1e-6
+    
     def __init__(
         self,
         session_id: str,
         backend_url: str = None,
-        save_to_db: bool = False
+        save_to_db: bool = False,
+        batch_size: int = SEND_BATCH_SIZE
     ):
         """
         Initialize EEG Streaming Server.
@@ -98,18 +156,35 @@ class EEGStreamingServer:
             URL backend Fumorive (default dari config.py)
         save_to_db : bool
             Apakah menyimpan ke database (untuk recording)
+        batch_size : int
+            Maks payload per POST saat backend tertinggal (1 = selalu
+            satu payload per POST)
         """
         self.session_id = session_id
         self.backend_url = backend_url or BACKEND_URL
         self.save_to_db = save_to_db
+        self.batch_size = max(1, batch_size)
         self.endpoint = f"{self.backend_url}{EEG_ENDPOINT}"
+        self.batch_endpoint = f"{self.backend_url}{EEG_BATCH_ENDPOINT}"
         
         # Statistics
         self.samples_sent = 0
         self.errors = 0
         self.consecutive_errors = 0
+        self.dropped = 0
         self.start_time = None
         
+        # HTTP runs on a sender thread so a slow backend never stalls
+        # acquisition; the main loop only enqueues payloads
+        self._send_queue: queue.Queue = queue.Queue(maxsize=self.SEND_QUEUE_SIZE)
+        self._sender: Optional[threading.Thread] = None
+        
+        # One pooled keep-alive session for all backend requests
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        
         # EEG Components (will be initialized on start)
         self.eeg: Optional[EEGAcquisition] = None
         self.preprocessor: Optional[EEGPreprocessor] = None
@@ -125,8 +200,9 @@ class EEGStreamingServer:
         """Initialize EEG processing components."""
         logger.info("Initializing EEG components...")
         
-        # Acquisition
-        self.eeg = EEGAcquisition()
+        # Acquisition: keep the LSL buffer short so a stalled tick drops
+        # samples instead of streaming stale data to the backend
+        self.eeg = EEGAcquisition(max_buflen=LSL_MAX_BUFLEN)
         self.eeg.connect()
         
         # Preprocessing
@@ -175,17 +251,29 @@ class EEGStreamingServer:
         self.analyzer.start_calibration()
         
         num_samples = int(duration / CHUNK_DURATION)
+        # One summary row per accepted window, handed to the analyzer in one
+        # call once every window has been pulled
+        cal_features = np.empty(
+            (num_samples, len(EEGFeatureExtractor.SUMMARY_KEYS)), dtype=np.float32
+        )
+        n_accepted = 0
+        last_print = -1.0
         for i in range(num_samples):
             elapsed = (i + 1) * CHUNK_DURATION
-            print(f"\r  ⏱️  Calibrating... {elapsed:.0f}/{duration:.0f}s", end="", flush=True)
+            # At most one progress write per second (plus the final one),
+            # however short CHUNK_DURATION is configured
+            if elapsed - last_print >= 1.0 or i == num_samples - 1:
+                print(f"\r  ⏱️  Calibrating... {elapsed:.0f}/{duration:.0f}s", end="", flush=True)
+                last_print = elapsed
             
             raw_data, _ = self.eeg.pull_chunk(duration=CHUNK_DURATION)
             if raw_data.size > 0:
                 clean_data, quality = self.preprocessor.process(raw_data)
                 if clean_data.size > 0 and quality > 0.3:
-                    features = self.extractor.extract(clean_data)
-                    self.analyzer.add_calibration_sample(features)
-        
+                    cal_features[n_accepted] = self.extractor.extract_summary(clean_data)
+                    n_accepted += 1
+
+        self.analyzer.add_calibration_samples(cal_features[:n_accepted])
         print("")  # New line after progress
         logger.info("")
         
@@ -212,66 +300,73 @@ class EEGStreamingServer:
         dict or None
             Processed data ready for backend, or None if invalid
         """
-        # 1. Acquire
-        raw_data, timestamps = self.eeg.pull_chunk(duration=CHUNK_DURATION)
+        # 1. Acquire: everything since the previous tick (start() paces
+        # ticks CHUNK_DURATION apart)
+        raw_data, timestamps = self.eeg.drain()
         if raw_data.size == 0:
             return None
         
+        # A flat window still scores 0.7 quality (only the flat-line check
+        # fires) but has no spectrum; skip filtering, FFT and analysis.
+        # Checked on the raw data: robust normalization would scale the
+        # filter's numerical residue back up to unit variance
+        if raw_data.var(axis=0).max() < self.FLAT_VARIANCE:
+            return None
+        
         # 2. Preprocess
         clean_data, quality = self.preprocessor.process(raw_data)
         if clean_data.size == 0 or quality < 0.2:
             return None
         
         # 3. Extract features
-        features = self.extractor.extract(clean_data)
-        if not features:
+        features = self.extractor.extract_summary(clean_data)
+        if features.size == 0:
             return None
         
         # 4. Analyze cognitive state
         result = self.analyzer.analyze(features, signal_quality=quality)
         
-        # 5. Calculate fatigue score (0-100 scale for backend)
-        theta_alpha = result['metrics'].get('theta_alpha', 1.0)
-        fatigue_score = min(100, max(0, (theta_alpha - 1.0) * 50 + 30))
-        
-        # Adjust based on detected state
-        if result['state'] == 'fatigue':
-            fatigue_score = max(fatigue_score, 50 + result['confidence'] * 45)
+        # Every scalar the rest of the tick needs, read once. analyze()
+        # always fills both ratios in metrics, and the band powers sit at
+        # fixed positions of the summary vector, so nothing needs a fallback
+        state = result['state']
+        confidence = result['confidence']
+        metrics = result['metrics']
+        theta_alpha = metrics['theta_alpha']
+        beta_alpha = metrics['beta_alpha']
+        theta_p, alpha_p, beta_p, gamma_p = features[_PAYLOAD_BANDS].tolist()
         
-        # 6. Get backend-compatible state
-        backend_state = get_backend_state(result['state'], fatigue_score)
-        
-        # 7. Get channel values (average of last chunk)
-        channel_values = {
-            "TP9": float(np.mean(raw_data[:, 0])) if raw_data.shape[1] > 0 else 0,
-            "AF7": float(np.mean(raw_data[:, 1])) if raw_data.shape[1] > 1 else 0,
-            "AF8": float(np.mean(raw_data[:, 2])) if raw_data.shape[1] > 2 else 0,
-            "TP10": float(np.mean(raw_data[:, 3])) if raw_data.shape[1] > 3 else 0
-        }
+        # 5. Fatigue score (0-100 scale for backend) and the backend's
+        # cognitive_state, in one compiled call
+        fatigue_score, state_code = _score(
+            theta_alpha, _STATE_CODES.get(state, 0), confidence
+        )
+        cognitive_state = _COGNITIVE_STATES[state_code]
         
-        # Determine cognitive state based on fatigue
-        if fatigue_score < 30:
-            cognitive_state = "alert"
-        elif fatigue_score < 60:
-            cognitive_state = "drowsy"
-        else:
-            cognitive_state = "fatigued"
+        # 6. Get channel values (average of last chunk): all channel means
+        # in one reduction, missing channels reported as 0. The float32
+        # means go to orjson as-is
+        means = raw_data.mean(axis=0)
+        if means.size < len(CH_NAMES):
+            means = np.pad(means, (0, len(CH_NAMES) - means.size))
+        channel_values = dict(zip(CH_NAMES, means))
         
-        # 8. Build payload
+        # 7. Build payload (NumPy scalars/arrays are fine: orjson
+        # serializes them natively in _send_to_backend)
         payload = {
             "session_id": self.session_id,
-            "timestamp": datetime.now().isoformat() + "Z",
+            "timestamp": _iso_timestamp(),
             "sample_rate": int(self.eeg.sampling_rate),
             "channels": channel_values,
             "processed": {
-                "theta_power": float(np.mean(features.get('theta', [0]))),
-                "alpha_power": float(np.mean(features.get('alpha', [0]))),
-                "beta_power": float(np.mean(features.get('beta', [0]))),
-                "gamma_power": float(np.mean(features.get('gamma', [0]))),
-                "theta_alpha_ratio": float(result['metrics'].get('theta_alpha', 1.0)),
-                "beta_alpha_ratio": float(result['metrics'].get('beta_alpha', 1.0)),
+                "theta_power": theta_p,
+                "alpha_power": alpha_p,
+                "beta_power": beta_p,
+                "gamma_power": gamma_p,
+                "theta_alpha_ratio": theta_alpha,
+                "beta_alpha_ratio": beta_alpha,
                 "eeg_fatigue_score": round(fatigue_score, 2),  # Frontend expects this name
-                "signal_quality": float(quality),
+                "signal_quality": quality,
                 "cognitive_state": cognitive_state  # Frontend expects this for State display
             },
             "save_to_db": self.save_to_db
@@ -279,54 +374,96 @@ class EEGStreamingServer:
         
         return payload
     
-    def _send_to_backend(self, payload: dict) -> bool:
+    def _send_to_backend(self, payloads: List[dict]) -> bool:
         """
         Send data to backend via HTTP POST.
         
+        A single payload goes to the stream endpoint as before; several
+        go to the batch endpoint as {"samples": [...]} in one request.
+        
         Returns True if successful.
         """
+        if len(payloads) == 1:
+            url, body = self.endpoint, payloads[0]
+        else:
+            url, body = self.batch_endpoint, {"samples": payloads}
+        
         try:
-            response = requests.post(
-                self.endpoint,
-                json=payload,
+            response = self._session.post(
+                url,
+                data=orjson.dumps(body, option=orjson.OPT_SERIALIZE_NUMPY),
                 timeout=2.0,
-                headers={"Content-Type": "application/json"}
+                headers=JSON_HEADERS
             )
             
             if response.status_code == 200:
-                self.samples_sent += 1
+                self.samples_sent += len(payloads)
                 self.consecutive_errors = 0
                 return True
-            else:
-                self.errors += 1
-                self.consecutive_errors += 1
-                if self.consecutive_errors <= 3:
-                    logger.warning(f"Backend returned {response.status_code}: {response.text[:100]}")
-                return False
-                
-        except requests.exceptions.ConnectionError:
-            self.errors += 1
-            self.consecutive_errors += 1
-            if self.consecutive_errors == 1:
-                logger.error(f"Cannot connect to backend at {self.endpoint}")
-                logger.error("Is the backend running? Start with: uvicorn main:app --reload")
-            elif self.consecutive_errors == 10:
-                logger.warning("Still trying to connect... (errors suppressed)")
-            return False
             
-        except requests.exceptions.Timeout:
             self.errors += 1
             self.consecutive_errors += 1
             if self.consecutive_errors <= 3:
-                logger.warning("Backend request timeout")
+                logger.warning(f"Backend returned {response.status_code}: {response.text[:100]}")
             return False
             
         except Exception as e:
+            # One handler for every failure, dispatched on the cause
             self.errors += 1
             self.consecutive_errors += 1
-            logger.error(f"Send error: {e}")
+            if isinstance(e, _ConnectionError):
+                if self.consecutive_errors == 1:
+                    logger.error(f"Cannot connect to backend at {self.endpoint}")
+                    logger.error("Is the backend running? Start with: uvicorn main:app --reload")
+                elif self.consecutive_errors == 10:
+                    logger.warning("Still trying to connect... (errors suppressed)")
+            elif isinstance(e, _Timeout):
+                if self.consecutive_errors <= 3:
+                    logger.warning("Backend request timeout")
+            else:
+                logger.error(f"Send error: {e}")
             return False
     
+    def _sender_loop(self):
+        """
+        Send queued payloads until the None sentinel arrives.
+        
+        Payloads that piled up while a previous request was in flight are
+        merged into one POST (up to batch_size); while the backend keeps
+        up every tick is still sent on its own, without waiting.
+        """
+        stopping = False
+        while not stopping:
+            payload = self._send_queue.get()
+            if payload is None:
+                break
+            
+            batch = [payload]
+            while len(batch) < self.batch_size:
+                try:
+                    payload = self._send_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if payload is None:
+                    stopping = True
+                    break
+                batch.append(payload)
+            
+            self._send_to_backend(batch)
+    
+    def _enqueue(self, payload: dict):
+        """Queue a payload for the sender, dropping the oldest if full."""
+        while True:
+            try:
+                self._send_queue.put_nowait(payload)
+                return
+            except queue.Full:
+                try:
+                    self._send_queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+    
     def start(self, calibrate: bool = True, calibration_duration: float = 10.0):
         """
         Start EEG streaming server.
@@ -350,7 +487,7 @@ class EEGStreamingServer:
             logger.info("")
             logger.info("Testing backend connection...")
             try:
-                test_response = requests.get(
+                test_response = self._session.get(
                     f"{self.backend_url}/health",
                     timeout=5.0
                 )
@@ -378,16 +515,35 @@ class EEGStreamingServer:
             logger.info("Press Ctrl+C to stop")
             logger.info("")
             
+            self._sender = threading.Thread(
+                target=self._sender_loop, name="eeg-sender", daemon=True
+            )
+            self._sender.start()
+            
             self.start_time = time.time()
             last_log = time.time()
             
+            # Fixed-deadline ticks on the monotonic clock: processing time
+            # doesn't add drift, and each tick drains exactly the samples
+            # that arrived since the previous one
+            self.eeg.drain()  # drop the backlog from before streaming
+            next_tick = time.monotonic()
+            
             while True:
+                next_tick += CHUNK_DURATION
+                delay = next_tick - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    # Fell behind: resync instead of firing missed ticks
+                    next_tick = time.monotonic()
+                
                 # Process chunk
                 payload = self._process_chunk()
                 
                 if payload:
-                    # Send to backend
-                    success = self._send_to_backend(payload)
+                    # Hand off to the sender thread
+                    self._enqueue(payload)
                     
                     # Log progress every 5 seconds
                     now = time.time()
@@ -399,18 +555,25 @@ class EEGStreamingServer:
                         logger.info(
                             f"[{elapsed:.0f}s] Fatigue: {fatigue:.0f}% | "
                             f"Signal Quality: {signal_quality:.2f} | "
-                            f"Sent: {self.samples_sent} | Errors: {self.errors}"
+                            f"Sent: {self.samples_sent} | Errors: {self.errors} | "
+                            f"Dropped: {self.dropped}"
                         )
                         last_log = now
-                
-                # Control rate
-                time.sleep(0.5)
         
         except KeyboardInterrupt:
             logger.info("")
             logger.info("Stopping EEG server...")
         
         finally:
+            if self._sender is not None:
+                # Let the sender flush what is queued, then stop it
+                try:
+                    self._send_queue.put(None, timeout=self.SENDER_JOIN_TIMEOUT)
+                except queue.Full:
+                    pass
+                self._sender.join(timeout=self.SENDER_JOIN_TIMEOUT)
+            self._session.close()
+            
             if self.eeg:
                 self.eeg.close()
             
@@ -423,6 +586,7 @@ class EEGStreamingServer:
             logger.info(f"Duration: {elapsed:.1f} seconds")
             logger.info(f"Samples sent: {self.samples_sent}")
             logger.info(f"Errors: {self.errors}")
+            logger.info(f"Dropped (send queue full): {self.dropped}")
             logger.info("Server stopped cleanly")
 
 
@@ -467,6 +631,12 @@ Note:
         action="store_true",
         help="Skip fase kalibrasi (gunakan default baseline)"
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=SEND_BATCH_SIZE,
+        help=f"Maks payload per POST saat backend tertinggal (default: {SEND_BATCH_SIZE}, 1 = nonaktif)"
+    )
     parser.add_argument(
         "--calibration-time",
         type=float,
@@ -493,7 +663,8 @@ Note:
     server = EEGStreamingServer(
         session_id=args.session_id,
         backend_url=args.backend_url,
-        save_to_db=args.save_db
+        save_to_db=args.save_db,
+        batch_size=args.batch_size
     )
     
     server.start(
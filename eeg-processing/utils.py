@@ -7,7 +7,6 @@ Common helper functions used across modules.
 """
 
 import os
-import csv
 import logging
 from datetime import datetime
 from typing import List, Optional
@@ -101,17 +100,17 @@ def save_eeg_to_csv(
     filepath : str
         Output file path
     """
-    with open(filepath, 'w', newline='') as f:
-        writer = csv.writer(f)
-        
-        # Header
-        header = ["timestamp"] + channel_labels
-        writer.writerow(header)
-        
-        # Data rows
-        for i in range(len(timestamps)):
-            row = [timestamps[i]] + list(data[i])
-            writer.writerow(row)
+    # All rows in one C-level write; enough significant digits to
+    # round-trip float64 timestamps and float32/float64 samples exactly
+    sample_fmt = "%.9g" if data.dtype == np.float32 else "%.17g"
+    np.savetxt(
+        filepath,
+        np.column_stack([timestamps, data]),
+        fmt=["%.17g"] + [sample_fmt] * data.shape[1],
+        delimiter=",",
+        header=",".join(["timestamp"] + list(channel_labels)),
+        comments=""
+    )
     
     print(f"[SUCCESS] Saved EEG data to: {filepath}")
 
@@ -136,12 +135,9 @@ def validate_eeg_data(data: np.ndarray) -> bool:
     if data.size == 0:
         return False
     
-    if np.isnan(data).any():
-        print("[WARN] EEG data contains NaN values")
-        return False
-    
-    if np.isinf(data).any():
-        print("[WARN] EEG data contains infinite values")
+    # NaN and ±inf in a single pass
+    if not np.isfinite(data).all():
+        print("[WARN] EEG data contains NaN or infinite values")
         return False
     
     return True